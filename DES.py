@@ -1,7 +1,66 @@
 # des_engine.py
 # Mengandung class DES lengkap yang Anda sediakan.
-from typing import List
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Tuple
+import atexit
 import binascii
+import functools
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsional, BatchDES kembali ke mesin skalar
+    np = None
+
+ScheduleCacheInfo = namedtuple('ScheduleCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class _ScheduleCache:
+    """Cache LRU terbatas untuk jadwal subkunci, dengan penghitung hit/miss"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        """Mengambil entri untuk `key`, atau membuatnya dengan factory(key) jika belum ada"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = factory(key)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def info(self) -> ScheduleCacheInfo:
+        with self._lock:
+            return ScheduleCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
 
 class DES:
     """Implementasi DES (Data Encryption Standard) dengan enkripsi dan dekripsi"""
@@ -85,6 +144,17 @@ class DES:
     PC2 = [14, 17, 11, 24, 1, 5, 3, 28, 15, 6, 21, 10, 23, 19, 12, 4, 26, 8, 16, 7, 27, 20, 13, 2, 41, 52, 31, 37, 47, 55, 30, 40, 51, 45, 33, 48, 44, 49, 39, 56, 34, 53, 46, 42, 50, 36, 29, 32]
     SHIFT = [1, 1, 2, 2, 2, 2, 2, 2, 1, 2, 2, 2, 2, 2, 2, 1]
 
+    # Jumlah maksimum jadwal subkunci yang disimpan di cache LRU (per class)
+    SCHEDULE_CACHE_SIZE = 64
+    _schedule_cache = _ScheduleCache(SCHEDULE_CACHE_SIZE)
+
+    # Ukuran IV (CBC) dan nonce (CTR); blok counter CTR = nonce 4 byte + counter 32-bit
+    IV_SIZE = 8
+    NONCE_SIZE = 4
+    # Ukuran potongan keystream CTR per worker dan batas minimal untuk fan-out ke executor
+    CTR_CHUNK_BYTES = 1 << 20
+    CTR_PARALLEL_MIN_BYTES = 4 << 20
+
     @staticmethod
     def _permute(data: List[int], perm_table: List[int]) -> List[int]:
         """Melakukan permutasi pada data berdasarkan tabel permutasi"""
@@ -145,8 +215,8 @@ class DES:
         return data + bytes([padding_value] * padding_needed)
 
     @staticmethod
-    def _unpad(data: bytes) -> bytes:
-        """Menghapus padding PKCS#7 dari data"""
+    def _pad_length(data: bytes) -> int:
+        """Memeriksa padding PKCS#7 di akhir data dan mengembalikan panjangnya"""
         if not data:
             raise ValueError("Data kosong, tidak dapat menghapus padding.")
         
@@ -159,83 +229,1341 @@ class DES:
             raise ValueError(f"Nilai padding tidak valid: {padding_value}")
         
         # Cek apakah semua byte padding memiliki nilai yang benar
-        if data[-padding_value:] != bytes([padding_value] * padding_value):
+        if bytes(data[-padding_value:]) != bytes([padding_value] * padding_value):
             # Jika byte terakhir adalah '\x04', pastikan 4 byte terakhir adalah '\x04'
             raise ValueError("Data padding korup atau tidak valid.")
         
-        return data[:-padding_value]
+        return padding_value
 
-    def encrypt(self, plaintext: str, key: str) -> str:
-        """Enkripsi plaintext menggunakan DES dengan chaining Mode ECB."""
+    @staticmethod
+    def _unpad(data: bytes) -> bytes:
+        """Menghapus padding PKCS#7 dari data"""
+        return data[:-DES._pad_length(data)]
+
+    @staticmethod
+    def _check_key(key: str) -> None:
         if len(key) != 8:
              raise ValueError("Kunci harus tepat 8 karakter (64 bit).")
+
+    def _expand_key(self, key: str) -> Tuple[List[List[int]], List[List[int]]]:
+        """Ekspansi kunci menjadi jadwal subkunci maju (enkripsi) dan mundur (dekripsi)"""
+        subkeys = self._generate_subkeys(self._bytes_to_bits(key.encode()))
+        return subkeys, subkeys[::-1]
+
+    def _key_schedules(self, key: str):
+        """Mengambil jadwal subkunci (maju, mundur) dari cache LRU, ekspansi jika belum ada"""
+        return self._schedule_cache.get(key, self._expand_key)
+
+    @classmethod
+    def cache_info(cls) -> 'ScheduleCacheInfo':
+        """Statistik cache jadwal subkunci (hits, misses, maxsize, currsize)"""
+        return cls._schedule_cache.info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """Mengosongkan cache jadwal subkunci dan mereset penghitungnya"""
+        cls._schedule_cache.clear()
+
+    @classmethod
+    def with_key(cls, key: str) -> 'KeyedDES':
+        """Membuat objek cipher dengan jadwal subkunci yang sudah diekspansi untuk `key`"""
+        return KeyedDES(cls(), key)
+
+    @staticmethod
+    def _bytes_to_bits(data: bytes) -> List[int]:
+        """Membongkar byte menjadi list bit (MSB lebih dulu)"""
+        return [int(bit) for byte in data for bit in format(byte, '08b')]
+
+    @staticmethod
+    def _bits_to_bytes(bits: List[int]) -> bytes:
+        """Kebalikan _bytes_to_bits"""
+        return bytes([int(''.join(map(str, bits[j:j+8])), 2) for j in range(0, len(bits), 8)])
+
+    def _crypt_block(self, block_bits: List[int], subkeys) -> List[int]:
+        """IP, 16 round Feistel, lalu FP untuk satu blok 64-bit"""
+        # Algoritma DES standar
+        permuted = self._permute(block_bits, self.IP)
+        L, R = permuted[:32], permuted[32:]
         
-        key_bits = [int(bit) for byte in key.encode() for bit in format(byte, '08b')]
-        subkeys = self._generate_subkeys(key_bits)
+        for subkey in subkeys:
+            L, R = R, self._xor(L, self._f_function(R, subkey))
         
-        # 1. Padding
-        padded_bytes = self._pad(plaintext.encode('utf-8'))
+        combined = R + L
+        return self._permute(combined, self.FP)
+
+    def _crypt_into(self, data, out, subkeys) -> None:
+        """Memproses setiap blok 8 byte dari `data` ke `out` (ECB) dengan jadwal subkunci"""
+        for i in range(0, len(data), 8):
+            block_bits = self._bytes_to_bits(data[i:i+8])
+            out[i:i+8] = self._bits_to_bytes(self._crypt_block(block_bits, subkeys))
+
+    def _encrypt_into(self, data, out, schedule) -> int:
+        """Padding + enkripsi ECB langsung ke buffer `out`, mengembalikan jumlah byte"""
+        full_length = len(data) - len(data) % 8
+        length = full_length + 8
+        if len(out) < length:
+            raise ValueError(f"Buffer output terlalu kecil, dibutuhkan {length} byte.")
         
-        ciphertext_hex = ""
-        # 2. Iterasi setiap blok 8 byte (64 bit)
-        for i in range(0, len(padded_bytes), 8):
-            block_bytes = padded_bytes[i:i+8]
-            block_bits = [int(bit) for byte in block_bytes for bit in format(byte, '08b')]
-            
-            # Algoritma DES standar (sama seperti sebelumnya)
-            permuted = self._permute(block_bits, self.IP)
-            L, R = permuted[:32], permuted[32:]
-            
-            for i in range(16):
-                L, R = R, self._xor(L, self._f_function(R, subkeys[i]))
-            
-            combined = R + L
-            block_ciphertext_bits = self._permute(combined, self.FP)
-            
-            block_ciphertext_bytes = bytes([int(''.join(map(str, block_ciphertext_bits[j:j+8])), 2) 
-                                       for j in range(0, 64, 8)])
-            
-            # Kumpulkan hasil heksadesimal
-            ciphertext_hex += binascii.hexlify(block_ciphertext_bytes).decode() 
-            
-        return ciphertext_hex 
+        data_view = memoryview(data)
+        out_view = memoryview(out)
+        # Blok penuh diproses tanpa menyalin plaintext, hanya blok terakhir yang di-padding
+        self._crypt_into(data_view[:full_length], out_view[:full_length], schedule)
+        self._crypt_into(self._pad(bytes(data_view[full_length:])), out_view[full_length:length], schedule)
+        return length
 
-    def decrypt(self, ciphertext: str, key: str) -> str:
-        """Dekripsi ciphertext menggunakan DES (ECB Mode) dan menghapus padding."""
-        if len(ciphertext) % 16 != 0 or len(key) != 8:
-             raise ValueError("Ciphertext harus kelipatan 16 karakter heksadesimal dan Kunci harus 8 karakter.")
-             
-        key_bits = [int(bit) for byte in key.encode() for bit in format(byte, '08b')]
-        subkeys = self._generate_subkeys(key_bits)
+    def _decrypt_into(self, data, out, schedule) -> int:
+        """Dekripsi ECB langsung ke buffer `out`, mengembalikan panjang tanpa padding"""
+        length = len(data)
+        if length == 0 or length % 8 != 0:
+            raise ValueError("Ciphertext harus kelipatan 8 byte.")
+        if len(out) < length:
+            raise ValueError(f"Buffer output terlalu kecil, dibutuhkan {length} byte.")
         
-        ciphertext_bytes = binascii.unhexlify(ciphertext)
+        out_view = memoryview(out)[:length]
+        self._crypt_into(memoryview(data), out_view, schedule)
+        return length - self._pad_length(out_view)
+
+    def _encrypt_bytes(self, data, schedule) -> bytes:
+        out = bytearray(len(data) - len(data) % 8 + 8)
+        self._encrypt_into(data, out, schedule)
+        return bytes(out)
+
+    def _decrypt_bytes(self, data, schedule) -> bytes:
+        out = bytearray(len(data))
+        del out[self._decrypt_into(data, out, schedule):]
+        return bytes(out)
+
+    def encrypt_bytes(self, data: bytes, key: str) -> bytes:
+        """Enkripsi data biner (ECB Mode + padding PKCS#7), output ciphertext biner."""
+        self._check_key(key)
+        forward, _ = self._key_schedules(key)
+        return self._encrypt_bytes(data, forward)
+
+    def decrypt_bytes(self, data: bytes, key: str) -> bytes:
+        """Dekripsi ciphertext biner (ECB Mode) dan menghapus padding."""
+        self._check_key(key)
+        _, reverse = self._key_schedules(key)
+        return self._decrypt_bytes(data, reverse)
+
+    def encrypt_into(self, data: bytes, out, key: str) -> int:
+        """Enkripsi `data` ke buffer `out` (bytearray/memoryview) milik pemanggil.
+
+        `out` minimal berukuran len(data) dibulatkan ke atas ke kelipatan 8 (+8
+        jika sudah kelipatan 8). Mengembalikan jumlah byte ciphertext yang ditulis.
+        """
+        self._check_key(key)
+        forward, _ = self._key_schedules(key)
+        return self._encrypt_into(data, out, forward)
+
+    def decrypt_into(self, data: bytes, out, key: str) -> int:
+        """Dekripsi `data` ke buffer `out` (minimal len(data) byte).
+
+        Mengembalikan panjang plaintext tanpa padding; byte padding tetap
+        tertulis di belakangnya di dalam `out`.
+        """
+        self._check_key(key)
+        _, reverse = self._key_schedules(key)
+        return self._decrypt_into(data, out, reverse)
+
+    def _cbc_encrypt_into(self, data, out, iv: bytes, schedule) -> None:
+        """Enkripsi CBC blok demi blok (berurutan, setiap blok bergantung pada blok sebelumnya)"""
+        previous = int.from_bytes(iv, 'big')
+        block = bytearray(8)
+        for i in range(0, len(data), 8):
+            chained = (int.from_bytes(data[i:i+8], 'big') ^ previous).to_bytes(8, 'big')
+            self._crypt_into(chained, block, schedule)
+            out[i:i+8] = block
+            previous = int.from_bytes(block, 'big')
+
+    def _encrypt_cbc(self, data, iv, schedule) -> bytes:
+        if iv is None:
+            iv = os.urandom(self.IV_SIZE)
+        elif len(iv) != self.IV_SIZE:
+            raise ValueError(f"IV harus tepat {self.IV_SIZE} byte.")
         
-        decrypted_bytes = b''
+        padded_bytes = self._pad(bytes(data))
+        out = bytearray(self.IV_SIZE + len(padded_bytes))
+        out[:self.IV_SIZE] = iv
+        self._cbc_encrypt_into(padded_bytes, memoryview(out)[self.IV_SIZE:], iv, schedule)
+        return bytes(out)
+
+    def _decrypt_cbc(self, data, schedule) -> bytes:
+        length = len(data) - self.IV_SIZE
+        if length <= 0 or length % 8 != 0:
+            raise ValueError("Data CBC harus berisi IV dan ciphertext kelipatan 8 byte.")
         
-        # 1. Iterasi setiap blok 8 byte (16 karakter heks)
-        for i in range(0, len(ciphertext_bytes), 8):
-            block_ciphertext_bytes = ciphertext_bytes[i:i+8]
-            block_ciphertext_bits = [int(bit) for byte in block_ciphertext_bytes for bit in format(byte, '08b')]
-            
-            # Algoritma DES standar (sama seperti sebelumnya)
-            permuted = self._permute(block_ciphertext_bits, self.IP)
-            L = permuted[:32]
-            R = permuted[32:]
-            
-            for i in range(15, -1, -1):
-                L, R = R, self._xor(L, self._f_function(R, subkeys[i]))
-            
-            combined = R + L
-            block_plaintext_bits = self._permute(combined, self.FP)
-            
-            block_plaintext_bytes = bytes([int(''.join(map(str, block_plaintext_bits[j:j+8])), 2) 
-                                   for j in range(0, 64, 8)])
-            
-            decrypted_bytes += block_plaintext_bytes
+        # Semua blok didekripsi sekaligus (paralel/bitsliced), lalu di-XOR dengan
+        # blok ciphertext sebelumnya (IV untuk blok pertama)
+        data_view = memoryview(data)
+        out = bytearray(length)
+        self._crypt_into(data_view[self.IV_SIZE:], out, schedule)
+        chained = _xor_bytes(out, data_view[:length])
+        return chained[:length - self._pad_length(chained)]
 
-        # 2. Hapus Padding
-        unpadded_bytes = self._unpad(decrypted_bytes)
+    def _ctr_keystream(self, schedule, nonce: int, first_block: int, count: int, executor=None,
+                       chunk_size: int = None) -> bytes:
+        """Keystream CTR untuk blok counter [first_block, first_block + count)"""
+        if first_block + count > 1 << 32:
+            raise ValueError("Counter CTR melebihi 2^32 blok untuk nonce ini.")
         
-        # Mengembalikan string plaintext
-        plaintext = unpadded_bytes.decode('utf-8')
-        return plaintext
\ No newline at end of file
+        chunk_blocks = max(1, (chunk_size or self.CTR_CHUNK_BYTES) // 8)
+        if executor is None or count * 8 < self.CTR_PARALLEL_MIN_BYTES or count <= chunk_blocks:
+            return _ctr_keystream_chunk(type(self), schedule, nonce, first_block, count)
+        
+        futures = [executor.submit(_ctr_keystream_chunk, type(self), schedule, nonce, start,
+                                   min(chunk_blocks, first_block + count - start))
+                   for start in range(first_block, first_block + count, chunk_blocks)]
+        return b''.join(future.result() for future in futures)
+
+    def _ctr_crypt(self, data, nonce: bytes, offset: int, schedule, executor=None, chunk_size: int = None) -> bytes:
+        if len(nonce) != self.NONCE_SIZE:
+            raise ValueError(f"Nonce harus tepat {self.NONCE_SIZE} byte.")
+        if offset < 0:
+            raise ValueError("Offset CTR tidak boleh negatif.")
+        if not data:
+            return b''
+        
+        # Akses acak: mulai dari blok counter yang memuat byte `offset`
+        first_block, skip = divmod(offset, 8)
+        count = (skip + len(data) + 7) // 8
+        keystream = self._ctr_keystream(schedule, int.from_bytes(nonce, 'big'), first_block, count,
+                                        executor, chunk_size)
+        return _xor_bytes(data, memoryview(keystream)[skip:skip + len(data)])
+
+    def encrypt_cbc(self, data: bytes, key: str, iv: bytes = None) -> bytes:
+        """Enkripsi mode CBC + padding PKCS#7. Output: IV (acak jika tidak diberikan) + ciphertext."""
+        self._check_key(key)
+        forward, _ = self._key_schedules(key)
+        return self._encrypt_cbc(data, iv, forward)
+
+    def decrypt_cbc(self, data: bytes, key: str) -> bytes:
+        """Dekripsi output encrypt_cbc (IV + ciphertext) dan menghapus padding."""
+        self._check_key(key)
+        _, reverse = self._key_schedules(key)
+        return self._decrypt_cbc(data, reverse)
+
+    def encrypt_ctr(self, data: bytes, key: str, nonce: bytes = None, executor=None) -> bytes:
+        """Enkripsi mode CTR (tanpa padding). Output: nonce (acak jika tidak diberikan) + ciphertext.
+
+        Untuk data besar, pembuatan keystream dapat disebar ke `executor`
+        (mis. concurrent.futures.ProcessPoolExecutor) per CTR_CHUNK_BYTES.
+        """
+        self._check_key(key)
+        if nonce is None:
+            nonce = os.urandom(self.NONCE_SIZE)
+        forward, _ = self._key_schedules(key)
+        return bytes(nonce) + self._ctr_crypt(data, nonce, 0, forward, executor)
+
+    def decrypt_ctr(self, data: bytes, key: str, executor=None) -> bytes:
+        """Dekripsi output encrypt_ctr (nonce + ciphertext)."""
+        self._check_key(key)
+        if len(data) < self.NONCE_SIZE:
+            raise ValueError("Data CTR harus diawali nonce.")
+        forward, _ = self._key_schedules(key)
+        data_view = memoryview(data)
+        return self._ctr_crypt(data_view[self.NONCE_SIZE:], data_view[:self.NONCE_SIZE], 0, forward, executor)
+
+    def ctr_crypt(self, data: bytes, key: str, nonce: bytes, offset: int = 0, executor=None,
+                  chunk_size: int = None) -> bytes:
+        """XOR `data` dengan keystream CTR mulai dari byte ke-`offset` stream.
+
+        Enkripsi dan dekripsi identik, sehingga rentang byte mana pun dapat
+        didekripsi tanpa memproses bagian sebelumnya.
+        """
+        self._check_key(key)
+        forward, _ = self._key_schedules(key)
+        return self._ctr_crypt(data, nonce, offset, forward, executor, chunk_size)
+
+    @staticmethod
+    def _encode_text(plaintext: str) -> bytes:
+        return plaintext.encode('utf-8')
+
+    @staticmethod
+    def _decode_text(data: bytes) -> str:
+        return data.decode('utf-8')
+
+    @staticmethod
+    def _hex_encode(data: bytes) -> str:
+        return data.hex()
+
+    @staticmethod
+    def _hex_decode(ciphertext: str) -> bytes:
+        return binascii.unhexlify(ciphertext)
+
+    def encrypt(self, plaintext: str, key: str) -> str:
+        """Enkripsi plaintext menggunakan DES dengan chaining Mode ECB."""
+        return self._hex_encode(self.encrypt_bytes(self._encode_text(plaintext), key))
+
+    def decrypt(self, ciphertext: str, key: str) -> str:
+        """Dekripsi ciphertext menggunakan DES (ECB Mode) dan menghapus padding."""
+        self._check_key(key)
+        if len(ciphertext) % 16 != 0:
+             raise ValueError("Ciphertext harus kelipatan 16 karakter heksadesimal.")
+             
+        return self._decode_text(self.decrypt_bytes(self._hex_decode(ciphertext), key))
+
+    def encryptor(self, key: str, mode: str = 'ECB', iv: bytes = None) -> 'DESEncryptor':
+        """Encryptor inkremental (update()/finalize()) untuk mode ECB, CBC atau CTR.
+
+        Untuk CBC/CTR, `iv` adalah IV/nonce (acak jika tidak diberikan) dan
+        dikeluarkan di awal output, sama seperti encrypt_cbc/encrypt_ctr.
+        """
+        self._check_key(key)
+        forward, _ = self._key_schedules(key)
+        return DESEncryptor(self, forward, mode, iv)
+
+    def decryptor(self, key: str, mode: str = 'ECB', iv: bytes = None) -> 'DESDecryptor':
+        """Decryptor inkremental; tanpa `iv`, IV/nonce dibaca dari awal stream (CBC/CTR)."""
+        self._check_key(key)
+        forward, reverse = self._key_schedules(key)
+        return DESDecryptor(self, forward if mode == 'CTR' else reverse, mode, iv)
+
+    def __init_subclass__(cls, **kwargs):
+        # Setiap subclass memiliki cache sendiri karena format jadwalnya berbeda
+        super().__init_subclass__(**kwargs)
+        cls._schedule_cache = _ScheduleCache(cls.SCHEDULE_CACHE_SIZE)
+
+
+class KeyedDES:
+    """Cipher DES yang terikat pada satu kunci.
+
+    Jadwal subkunci maju dan mundur diekspansi sekali saat objek dibuat,
+    sehingga enkripsi/dekripsi per pesan tidak melakukan ekspansi kunci lagi.
+    """
+
+    def __init__(self, engine: DES, key: str):
+        engine._check_key(key)
+        self.engine = engine
+        self.key = key
+        self.forward, self.reverse = engine._key_schedules(key)
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """Enkripsi data biner (ECB Mode + padding PKCS#7)."""
+        return self.engine._encrypt_bytes(data, self.forward)
+
+    def decrypt_bytes(self, data: bytes) -> bytes:
+        """Dekripsi ciphertext biner (ECB Mode) dan menghapus padding."""
+        return self.engine._decrypt_bytes(data, self.reverse)
+
+    def encrypt_into(self, data: bytes, out) -> int:
+        """Enkripsi `data` ke buffer `out`, lihat DES.encrypt_into."""
+        return self.engine._encrypt_into(data, out, self.forward)
+
+    def decrypt_into(self, data: bytes, out) -> int:
+        """Dekripsi `data` ke buffer `out`, lihat DES.decrypt_into."""
+        return self.engine._decrypt_into(data, out, self.reverse)
+
+    def encrypt_cbc(self, data: bytes, iv: bytes = None) -> bytes:
+        """Enkripsi mode CBC, lihat DES.encrypt_cbc."""
+        return self.engine._encrypt_cbc(data, iv, self.forward)
+
+    def decrypt_cbc(self, data: bytes) -> bytes:
+        """Dekripsi mode CBC, lihat DES.decrypt_cbc."""
+        return self.engine._decrypt_cbc(data, self.reverse)
+
+    def encrypt_ctr(self, data: bytes, nonce: bytes = None, executor=None) -> bytes:
+        """Enkripsi mode CTR, lihat DES.encrypt_ctr."""
+        if nonce is None:
+            nonce = os.urandom(self.engine.NONCE_SIZE)
+        return bytes(nonce) + self.engine._ctr_crypt(data, nonce, 0, self.forward, executor)
+
+    def decrypt_ctr(self, data: bytes, executor=None) -> bytes:
+        """Dekripsi mode CTR, lihat DES.decrypt_ctr."""
+        size = self.engine.NONCE_SIZE
+        if len(data) < size:
+            raise ValueError("Data CTR harus diawali nonce.")
+        data_view = memoryview(data)
+        return self.engine._ctr_crypt(data_view[size:], data_view[:size], 0, self.forward, executor)
+
+    def ctr_crypt(self, data: bytes, nonce: bytes, offset: int = 0, executor=None, chunk_size: int = None) -> bytes:
+        """Keystream CTR dengan akses acak, lihat DES.ctr_crypt."""
+        return self.engine._ctr_crypt(data, nonce, offset, self.forward, executor, chunk_size)
+
+    def encrypt(self, plaintext: str) -> str:
+        """Enkripsi plaintext (ECB Mode), output heksadesimal."""
+        engine = self.engine
+        return engine._hex_encode(self.encrypt_bytes(engine._encode_text(plaintext)))
+
+    def decrypt(self, ciphertext: str) -> str:
+        """Dekripsi ciphertext heksadesimal (ECB Mode) dan menghapus padding."""
+        if len(ciphertext) % 16 != 0:
+            raise ValueError("Ciphertext harus kelipatan 16 karakter heksadesimal.")
+        engine = self.engine
+        return engine._decode_text(self.decrypt_bytes(engine._hex_decode(ciphertext)))
+
+    def encryptor(self, mode: str = 'ECB', iv: bytes = None) -> 'DESEncryptor':
+        """Encryptor inkremental, lihat DES.encryptor."""
+        return DESEncryptor(self.engine, self.forward, mode, iv)
+
+    def decryptor(self, mode: str = 'ECB', iv: bytes = None) -> 'DESDecryptor':
+        """Decryptor inkremental, lihat DES.decryptor."""
+        return DESDecryptor(self.engine, self.forward if mode == 'CTR' else self.reverse, mode, iv)
+
+
+# Ukuran potongan default untuk helper streaming (kelipatan 8 byte)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _DESStream:
+    """Status bersama encryptor/decryptor streaming"""
+
+    MODES = ('ECB', 'CBC', 'CTR')
+
+    def __init__(self, engine: DES, schedule, mode: str, iv: bytes):
+        if mode not in self.MODES:
+            raise ValueError(f"Mode tidak dikenal: {mode}. Gunakan salah satu dari {', '.join(self.MODES)}.")
+        self.engine = engine
+        self.schedule = schedule
+        self.mode = mode
+        self._header_size = {'ECB': 0, 'CBC': engine.IV_SIZE, 'CTR': engine.NONCE_SIZE}[mode]
+        if iv is not None and len(iv) != self._header_size:
+            raise ValueError(f"IV/nonce untuk mode {mode} harus tepat {self._header_size} byte.")
+        # IV untuk CBC berubah menjadi blok ciphertext terakhir; nonce CTR tetap
+        self._iv = bytes(iv) if iv is not None else None
+        self._offset = 0
+        self._pending = b''
+        self._finalized = False
+
+    def _check_open(self) -> None:
+        if self._finalized:
+            raise ValueError("Stream sudah di-finalize.")
+
+
+class DESEncryptor(_DESStream):
+    """Enkripsi inkremental: update() untuk setiap potongan, finalize() untuk padding akhir.
+
+    Hanya sisa kurang dari satu blok yang disimpan di antara pemanggilan,
+    sehingga memori tetap konstan berapa pun panjang input.
+    """
+
+    def __init__(self, engine: DES, schedule, mode: str = 'ECB', iv: bytes = None):
+        super().__init__(engine, schedule, mode, iv)
+        if self._iv is None and self._header_size:
+            self._iv = os.urandom(self._header_size)
+        self._header = self._iv if self._header_size else b''
+
+    def update(self, data) -> bytes:
+        """Mengenkripsi potongan berikutnya, mengembalikan ciphertext yang sudah siap"""
+        self._check_open()
+        header, self._header = self._header, b''
+        if self.mode == 'CTR':
+            output = self.engine._ctr_crypt(data, self._iv, self._offset, self.schedule)
+            self._offset += len(data)
+            return header + output
+
+        buffered = self._pending + bytes(data) if self._pending else data
+        full_length = len(buffered) - len(buffered) % 8
+        self._pending = bytes(buffered[full_length:])
+        out = bytearray(len(header) + full_length)
+        out[:len(header)] = header
+        if full_length:
+            self._crypt(memoryview(buffered)[:full_length], memoryview(out)[len(header):])
+        return bytes(out)
+
+    def finalize(self) -> bytes:
+        """Menambahkan padding PKCS#7 (ECB/CBC) dan mengembalikan ciphertext terakhir"""
+        self._check_open()
+        self._finalized = True
+        header, self._header = self._header, b''
+        if self.mode == 'CTR':
+            return header
+
+        out = bytearray(8)
+        self._crypt(self.engine._pad(self._pending), out)
+        self._pending = b''
+        return header + bytes(out)
+
+    def _crypt(self, data, out) -> None:
+        if self.mode == 'CBC':
+            self.engine._cbc_encrypt_into(data, out, self._iv, self.schedule)
+            self._iv = bytes(out[-8:])
+        else:
+            self.engine._crypt_into(data, out, self.schedule)
+
+
+class DESDecryptor(_DESStream):
+    """Dekripsi inkremental: update() untuk setiap potongan, finalize() untuk menghapus padding.
+
+    Blok penuh terakhir selalu ditahan sampai finalize(), karena hanya blok
+    itu yang boleh berisi padding PKCS#7.
+    """
+
+    def update(self, data) -> bytes:
+        """Mendekripsi potongan berikutnya, mengembalikan plaintext yang sudah pasti"""
+        self._check_open()
+        buffered = self._pending + bytes(data) if self._pending else data
+
+        if self._iv is None and self._header_size:
+            # IV/nonce dibaca dari awal stream
+            if len(buffered) < self._header_size:
+                self._pending = bytes(buffered)
+                return b''
+            self._iv = bytes(buffered[:self._header_size])
+            buffered = memoryview(buffered)[self._header_size:]
+
+        if self.mode == 'CTR':
+            self._pending = b''
+            output = self.engine._ctr_crypt(buffered, self._iv, self._offset, self.schedule)
+            self._offset += len(buffered)
+            return output
+
+        full_length = len(buffered) - len(buffered) % 8
+        if full_length == len(buffered):
+            full_length -= 8
+        if full_length <= 0:
+            self._pending = bytes(buffered)
+            return b''
+
+        self._pending = bytes(buffered[full_length:])
+        out = bytearray(full_length)
+        self._crypt(memoryview(buffered)[:full_length], out)
+        return bytes(out)
+
+    def finalize(self) -> bytes:
+        """Mendekripsi blok terakhir dan menghapus padding PKCS#7 (ECB/CBC)"""
+        self._check_open()
+        self._finalized = True
+        if self._iv is None and self._header_size:
+            raise ValueError("Stream berakhir sebelum IV/nonce lengkap.")
+        if self.mode == 'CTR':
+            return b''
+        if len(self._pending) != 8:
+            raise ValueError("Ciphertext harus kelipatan 8 byte.")
+
+        out = bytearray(8)
+        self._crypt(self._pending, out)
+        self._pending = b''
+        return bytes(out[:8 - self.engine._pad_length(out)])
+
+    def _crypt(self, data, out) -> None:
+        self.engine._crypt_into(data, out, self.schedule)
+        if self.mode == 'CBC':
+            # XOR dengan blok ciphertext sebelumnya (IV untuk blok pertama)
+            previous = self._iv + bytes(data[:-8])
+            out[:] = _xor_bytes(out, previous)
+            self._iv = bytes(data[-8:])
+
+
+def iter_file_chunks(fileobj, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Generator potongan berukuran tetap dari objek file biner"""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_mmap_chunks(mapped, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Generator potongan dari objek mmap sebagai memoryview (tanpa salinan)"""
+    view = memoryview(mapped)
+    try:
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+    finally:
+        view.release()
+
+
+def iter_socket_chunks(sock, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Generator data dari socket sampai koneksi ditutup oleh lawan"""
+    while True:
+        chunk = sock.recv(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_stream(processor, chunks):
+    """Menjalankan encryptor/decryptor atas iterable potongan, menghasilkan output per potongan.
+
+    Contoh: for data in process_stream(engine.encryptor(key, 'CTR'), iter_file_chunks(f)):
+                out.write(data)
+    """
+    for chunk in chunks:
+        output = processor.update(chunk)
+        if output:
+            yield output
+    output = processor.finalize()
+    if output:
+        yield output
+
+
+def _xor_bytes(data1, data2) -> bytes:
+    """XOR dua buffer yang sama panjang sekaligus melalui int besar"""
+    length = len(data1)
+    value = int.from_bytes(data1, 'big') ^ int.from_bytes(data2, 'big')
+    return value.to_bytes(length, 'big')
+
+
+def _ctr_keystream_chunk(engine_cls, schedule, nonce: int, first_block: int, count: int) -> bytes:
+    """Membuat keystream CTR untuk `count` blok (dipakai langsung atau di proses worker)"""
+    counters = struct.pack(f'>{count}Q', *range((nonce << 32) + first_block, (nonce << 32) + first_block + count))
+    keystream = bytearray(count * 8)
+    engine_cls()._crypt_into(counters, keystream, schedule)
+    return bytes(keystream)
+
+
+def _permute_int(value: int, perm_table: List[int], width: int) -> int:
+    """Permutasi bit pada integer (posisi 1 = MSB dari `width` bit)"""
+    result = 0
+    for pos in perm_table:
+        result = (result << 1) | ((value >> (width - pos)) & 1)
+    return result
+
+
+def _rotated_half_source(pos: int) -> int:
+    """Posisi bit asal (1..32) untuk posisi `pos` pada setengah blok yang dirotasi kanan 1 bit"""
+    return (pos - 2) % 32 + 1
+
+
+def _build_byte_tables(perm_table: List[int], width: int) -> List[List[int]]:
+    """Mengompilasi tabel permutasi menjadi tabel lookup per-byte.
+
+    Menghasilkan width // 8 tabel berisi 256 mask; hasil permutasi adalah OR
+    dari mask untuk setiap byte input (byte pertama = byte paling signifikan).
+    """
+    out_width = len(perm_table)
+    bit_masks = [0] * width
+    for j, pos in enumerate(perm_table):
+        bit_masks[pos - 1] |= 1 << (out_width - 1 - j)
+
+    tables = []
+    for byte_index in range(width // 8):
+        masks = bit_masks[byte_index * 8:(byte_index + 1) * 8]
+        table = [0] * 256
+        for value in range(1, 256):
+            lowest = value & -value
+            table[value] = table[value ^ lowest] | masks[8 - lowest.bit_length()]
+        tables.append(table)
+    return tables
+
+
+def _permute_bytes(value: int, tables: List[List[int]]) -> int:
+    """Permutasi integer menggunakan tabel hasil _build_byte_tables"""
+    result = 0
+    shift = 8 * (len(tables) - 1)
+    for table in tables:
+        result |= table[(value >> shift) & 255]
+        shift -= 8
+    return result
+
+
+def _build_sp_tables(s_box: List[List[List[int]]], p_table: List[int]) -> List[List[int]]:
+    """Menggabungkan S-Box dan permutasi P menjadi 8 tabel SP (64 entri per tabel).
+
+    Setiap entri sudah dirotasi kanan 1 bit agar sesuai dengan representasi
+    setengah blok yang dipakai FastDES (lihat FastDES._crypt_into).
+    """
+    tables = []
+    for i in range(8):
+        table = []
+        for six_bits in range(64):
+            row = ((six_bits >> 4) & 2) | (six_bits & 1)
+            col = (six_bits >> 1) & 15
+            substituted = s_box[i][row][col] << (28 - 4 * i)
+            value = _permute_int(substituted, p_table, 32)
+            table.append(((value >> 1) | (value << 31)) & 0xFFFFFFFF)
+        tables.append(table)
+    return tables
+
+
+def _merge_sp_pair(first: List[int], second: List[int]) -> List[int]:
+    """Menggabungkan dua tabel SP menjadi satu tabel 16384 entri.
+
+    Indeks 14-bit berisi potongan 6-bit pertama, 2 bit celah (diabaikan) dan
+    potongan 6-bit kedua, sesuai jarak antar potongan E di dalam R. Nilai
+    32-bit diduplikasi ke 32 bit atas (lihat FastDES._crypt_into).
+    """
+    table = []
+    for a in range(64):
+        row = [(first[a] | second[b]) * 0x100000001 for b in range(64)]
+        table.extend(row * 4)
+    return table
+
+
+# Jadwal FastDES: tuple tahap (1 untuk DES, 3 untuk 3DES), tiap tahap 8 pasangan round
+_Stages = Tuple[List[Tuple[int, int, int, int]], ...]
+
+
+class FastDES(DES):
+    """Mesin DES berbasis integer 64-bit dengan tabel gabungan S-Box/P-Box (SP).
+
+    Menghasilkan output yang identik byte-per-byte dengan class DES, tetapi blok,
+    setengah blok dan subkunci disimpan sebagai int sehingga tidak ada list bit
+    yang dibuat ulang pada setiap round.
+    """
+
+    SP = _build_sp_tables(DES.S_BOX, DES.P)
+    # Pasangan SP untuk potongan genap (0,2), (4,6) dan ganjil (1,3), (5,7)
+    SP_PAIRS = [_merge_sp_pair(SP[0], SP[2]), _merge_sp_pair(SP[4], SP[6]),
+                _merge_sp_pair(SP[1], SP[3]), _merge_sp_pair(SP[5], SP[7])]
+
+    # Tabel lookup per-byte untuk permutasi tetap, dibangun sekali saat import
+    # dan dipakai bersama oleh semua instance. IP sudah termasuk rotasi kanan
+    # 1 bit pada L dan R, FP membatalkan rotasi tersebut sebelum permutasi.
+    IP_TABLES = _build_byte_tables(
+        [DES.IP[_rotated_half_source(j) - 1] if j <= 32 else DES.IP[32 + _rotated_half_source(j - 32) - 1]
+         for j in range(1, 65)], 64)
+    FP_TABLES = _build_byte_tables(
+        [(pos % 32) + 1 if pos <= 32 else 32 + ((pos - 32) % 32) + 1 for pos in DES.FP], 64)
+    PC1_TABLES = _build_byte_tables(DES.PC1, 64)
+    PC2_TABLES = _build_byte_tables(DES.PC2, len(DES.PC1))
+
+    # Mulai jumlah blok ini mesin bitsliced lebih cepat daripada mesin tabel
+    BITSLICE_MIN_BLOCKS = 256
+    # Jumlah blok yang di-transpose menjadi bit-plane dalam satu lintasan
+    BITSLICE_CHUNK_BLOCKS = 65536
+
+    def _round_keys(self, key: str) -> List[Tuple[int, int]]:
+        """Generate 16 subkunci sebagai pasangan (kx, ky) untuk potongan E genap/ganjil"""
+        key_int = int.from_bytes(key.encode(), 'big')
+        permuted_key = _permute_bytes(key_int, self.PC1_TABLES)
+
+        # Lebar C selalu 28 bit, sisanya (sesuai panjang tabel PC1) masuk ke D
+        width = len(self.PC1)
+        d_width = width - 28
+        c_mask = (1 << 28) - 1
+        d_mask = (1 << d_width) - 1
+        C = permuted_key >> d_width
+        D = permuted_key & d_mask
+
+        round_keys = []
+        for shift in self.SHIFT:
+            C = ((C << shift) | (C >> (28 - shift))) & c_mask
+            D = ((D << shift) | (D >> (d_width - shift))) & d_mask
+            subkey = _permute_bytes((C << d_width) | D, self.PC2_TABLES)
+
+            # Potongan 6-bit ke-i dari subkunci 48-bit, ditempatkan sesuai
+            # posisinya di R terduplikasi (lihat _crypt_into)
+            chunks = [(subkey >> (42 - 6 * i)) & 63 for i in range(8)]
+            kx = (chunks[0] << 26) | (chunks[2] << 18) | (chunks[4] << 10) | (chunks[6] << 2)
+            ky = (chunks[1] << 22) | (chunks[3] << 14) | (chunks[5] << 38) | (chunks[7] << 30)
+            round_keys.append((kx, ky))
+
+        return round_keys
+
+    @staticmethod
+    def _pair_rounds(round_keys: List[Tuple[int, int]]) -> List[Tuple[int, int, int, int]]:
+        """Mengelompokkan 16 subkunci menjadi 8 pasangan round (kx1, ky1, kx2, ky2)"""
+        return [round_keys[i] + round_keys[i + 1] for i in range(0, 16, 2)]
+
+    def _crypt_into(self, data, out, schedule: _Stages) -> None:
+        """Memproses semua blok 8 byte dari `data` ke `out` (ECB) dengan jadwal yang diberikan.
+
+        Input besar (minimal BITSLICE_MIN_BLOCKS blok) diproses oleh mesin
+        bitsliced, input kecil oleh mesin tabel.
+        """
+        if len(data) // 8 >= self.BITSLICE_MIN_BLOCKS:
+            _bitslice_crypt_into(data, out, schedule, self.BITSLICE_CHUNK_BLOCKS)
+        else:
+            self._table_crypt_into(data, out, schedule)
+
+    def _cbc_encrypt_into(self, data, out, iv: bytes, schedule) -> None:
+        self._table_crypt_into(data, out, schedule, int.from_bytes(iv, 'big'))
+
+    def _table_crypt_into(self, data, out, schedule: _Stages, chain: int = None) -> None:
+        """Mesin tabel: memproses blok satu per satu dengan lookup tabel IP/SP/FP.
+
+        Jika `chain` diberikan (IV), setiap blok di-XOR dengan output blok
+        sebelumnya sebelum dienkripsi (enkripsi CBC).
+
+        Setengah blok L dan R disimpan dalam keadaan dirotasi kanan 1 bit dan
+        diduplikasi ke 32 bit atas, sehingga ekspansi E cukup berupa pergeseran
+        tanpa rotasi: potongan genap (0,2 | 4,6) ada di bit 18..31 dan 2..15,
+        potongan ganjil (1,3 | 5,7) di bit 14..27 dan 30..43. Dua potongan yang
+        berdekatan dibaca sekaligus dari tabel SP_PAIRS.
+
+        Di akhir setiap tahap L dan R ditukar, sehingga untuk 3DES pasangan
+        FP/IP di antara tahap tidak perlu dihitung (keduanya saling membatalkan).
+        """
+        SP02, SP46, SP13, SP57 = self.SP_PAIRS
+        IP0, IP1, IP2, IP3, IP4, IP5, IP6, IP7 = self.IP_TABLES
+        FP0, FP1, FP2, FP3, FP4, FP5, FP6, FP7 = self.FP_TABLES
+        count = len(data) // 8
+        output = []
+
+        for block in struct.unpack_from(f'>{count}Q', data):
+            if chain is not None:
+                block ^= chain
+            permuted = (IP0[block >> 56] | IP1[(block >> 48) & 255] | IP2[(block >> 40) & 255] |
+                        IP3[(block >> 32) & 255] | IP4[(block >> 24) & 255] | IP5[(block >> 16) & 255] |
+                        IP6[(block >> 8) & 255] | IP7[block & 255])
+            L = (permuted >> 32) * 0x100000001
+            R = (permuted & 0xFFFFFFFF) * 0x100000001
+
+            for stage in schedule:
+                for kx1, ky1, kx2, ky2 in stage:
+                    t = R ^ kx1
+                    u = R ^ ky1
+                    L ^= (SP02[(t >> 18) & 16383] | SP46[(t >> 2) & 16383] |
+                          SP13[(u >> 14) & 16383] | SP57[(u >> 30) & 16383])
+                    t = L ^ kx2
+                    u = L ^ ky2
+                    R ^= (SP02[(t >> 18) & 16383] | SP46[(t >> 2) & 16383] |
+                          SP13[(u >> 14) & 16383] | SP57[(u >> 30) & 16383])
+                L, R = R, L
+
+            block = (FP0[(L >> 24) & 255] | FP1[(L >> 16) & 255] | FP2[(L >> 8) & 255] | FP3[L & 255] |
+                     FP4[(R >> 24) & 255] | FP5[(R >> 16) & 255] | FP6[(R >> 8) & 255] | FP7[R & 255])
+            output.append(block)
+            if chain is not None:
+                chain = block
+
+        struct.pack_into(f'>{count}Q', out, 0, *output)
+
+    def _expand_key(self, key: str) -> Tuple[_Stages, _Stages]:
+        """Ekspansi kunci menjadi jadwal round berpasangan maju dan mundur (satu tahap)"""
+        round_keys = self._round_keys(key)
+        return (self._pair_rounds(round_keys),), (self._pair_rounds(round_keys[::-1]),)
+
+
+def _build_sbox_networks(s_box: List[List[List[int]]]) -> List[List[List[Tuple[int, ...]]]]:
+    """Menyusun jaringan gerbang AND/OR untuk setiap bit output S-Box.
+
+    Untuk S-Box i dan bit output o (0 = MSB), hasilnya adalah 4 tuple (satu per
+    baris): indeks kolom yang menghasilkan bit 1. Bit output kemudian dihitung
+    sebagai OR dari (minterm baris AND OR minterm kolom tersebut).
+    """
+    networks = []
+    for box in s_box:
+        outputs = []
+        for o in range(4):
+            shift = 3 - o
+            outputs.append([tuple(col for col in range(16) if (box[row][col] >> shift) & 1)
+                            for row in range(4)])
+        networks.append(outputs)
+    return networks
+
+
+_SBOX_NETWORKS = _build_sbox_networks(DES.S_BOX)
+# Tabel translate: byte -> karakter '0'/'1' untuk bit ke-t (t = 7 adalah MSB)
+_BIT_CHARS = [bytes(b'1'[0] if (value >> t) & 1 else b'0'[0] for value in range(256)) for t in range(8)]
+# Tabel translate: karakter '0'/'1' -> nilai byte dengan bit ke-t
+_CHAR_BITS = [bytes((1 << t) if value == b'1'[0] else 0 for value in range(256)) for t in range(8)]
+
+
+def _schedule_subkeys(stage: List[Tuple[int, int, int, int]]) -> List[int]:
+    """Mengembalikan 16 subkunci 48-bit dari satu tahap jadwal berpasangan FastDES"""
+    subkeys = []
+    for kx1, ky1, kx2, ky2 in stage:
+        for kx, ky in ((kx1, ky1), (kx2, ky2)):
+            chunks = [(kx >> 26) & 63, (ky >> 22) & 63, (kx >> 18) & 63, (ky >> 14) & 63,
+                      (kx >> 10) & 63, (ky >> 38) & 63, (kx >> 2) & 63, (ky >> 30) & 63]
+            subkey = 0
+            for chunk in chunks:
+                subkey = (subkey << 6) | chunk
+            subkeys.append(subkey)
+    return subkeys
+
+
+def _bitslice_sbox(network: List[List[Tuple[int, ...]]], pos: List[int], neg: List[int], full: int) -> List[int]:
+    """Evaluasi satu S-Box secara bitsliced dari 6 literal positif dan negatifnya"""
+    p0, p1, p2, p3, p4, p5 = pos
+    n0, n1, n2, n3, n4, n5 = neg
+    # Minterm baris (b0, b5) dan kolom (b1, b2, b3, b4)
+    rows = (n0 & n5, n0 & p5, p0 & n5, p0 & p5)
+    left = (n1 & n2, n1 & p2, p1 & n2, p1 & p2)
+    right = (n3 & n4, n3 & p4, p3 & n4, p3 & p4)
+    cols = [a & b for a in left for b in right]
+
+    outputs = []
+    for row_cols in network:
+        acc = 0
+        for row, ones in zip(rows, row_cols):
+            if not ones:
+                continue
+            if len(ones) > 8:
+                # Lebih murah menghitung komplemen dari kolom yang bernilai 0
+                term = 0
+                for col in range(16):
+                    if col not in ones:
+                        term |= cols[col]
+                acc |= row & (term ^ full)
+            else:
+                term = cols[ones[0]]
+                for col in ones[1:]:
+                    term |= cols[col]
+                acc |= row & term
+        outputs.append(acc)
+    return outputs
+
+
+def _bitslice_crypt_into(data, out, schedule: _Stages, chunk_blocks: int) -> None:
+    """Mesin bitsliced: N blok di-transpose menjadi 64 bit-plane (int Python N bit).
+
+    Permutasi IP, E, P dan FP menjadi sekadar pemilihan ulang bit-plane, XOR
+    dengan subkunci menjadi pertukaran literal positif/negatif, dan S-Box
+    dievaluasi sebagai jaringan gerbang boolean untuk N blok sekaligus.
+    """
+    stage_key_bits = [[[(subkey >> (47 - j)) & 1 for j in range(48)] for subkey in _schedule_subkeys(stage)]
+                      for stage in schedule]
+    ip, fp, expansion, p_table = DES.IP, DES.FP, DES.E, DES.P
+    count = len(data) // 8
+
+    for start in range(0, count, chunk_blocks):
+        blocks = min(chunk_blocks, count - start)
+        raw = bytes(data[start * 8:(start + blocks) * 8])
+        full = (1 << blocks) - 1
+
+        # Transpose: plane j berisi bit ke-j (0 = MSB) dari setiap blok
+        planes = []
+        for column_index in range(8):
+            column = raw[column_index::8]
+            for t in range(7, -1, -1):
+                planes.append(int(column.translate(_BIT_CHARS[t]), 2))
+
+        L = [planes[pos - 1] for pos in ip[:32]]
+        R = [planes[pos - 1] for pos in ip[32:]]
+
+        for key_bits in stage_key_bits:
+            for bits in key_bits:
+                not_R = [plane ^ full for plane in R]
+                substituted = []
+                for i, network in enumerate(_SBOX_NETWORKS):
+                    pos, neg = [], []
+                    for j in range(6 * i, 6 * i + 6):
+                        index = expansion[j] - 1
+                        if bits[j]:
+                            pos.append(not_R[index])
+                            neg.append(R[index])
+                        else:
+                            pos.append(R[index])
+                            neg.append(not_R[index])
+                    substituted.extend(_bitslice_sbox(network, pos, neg, full))
+                L, R = R, [L[j] ^ substituted[pos - 1] for j, pos in enumerate(p_table)]
+            # Pertukaran akhir tahap (FP/IP di antara tahap 3DES saling membatalkan)
+            L, R = R, L
+
+        combined = L + R
+        result = bytearray(blocks * 8)
+        for column_index in range(8):
+            column = 0
+            for t in range(8):
+                plane = combined[fp[8 * column_index + 7 - t] - 1]
+                column |= int.from_bytes(format(plane, f'0{blocks}b').encode().translate(_CHAR_BITS[t]), 'big')
+            result[column_index::8] = column.to_bytes(blocks, 'big')
+        out[start * 8:(start + blocks) * 8] = result
+
+
+class BitslicedDES(FastDES):
+    """FastDES yang selalu memakai mesin bitsliced, berapa pun ukuran input.
+
+    Berguna untuk benchmark dan pemeriksaan silang; FastDES sendiri memilih
+    mesin bitsliced secara otomatis mulai BITSLICE_MIN_BLOCKS blok.
+    """
+
+    BITSLICE_MIN_BLOCKS = 1
+
+
+class BatchDES(FastDES):
+    """Mode batch FastDES yang memproses banyak blok sekaligus dengan NumPy.
+
+    Buffer dipandang sebagai array uint64, lalu IP, 16 round (lookup tabel SP
+    tervektorisasi) dan FP dijalankan pada semua blok secara bersamaan. Tanpa
+    NumPy, atau untuk input kecil, class ini memakai mesin skalar FastDES.
+    """
+
+    # Input di bawah jumlah blok ini lebih cepat diproses oleh mesin skalar
+    BATCH_MIN_BLOCKS = 32
+    # Jumlah blok per potongan agar array sementara tetap kecil (cache-friendly)
+    BATCH_CHUNK_BLOCKS = 65536
+
+    _array_tables = None
+
+    @classmethod
+    def _numpy_tables(cls):
+        """Salinan tabel IP/FP/SP sebagai array uint64, dibangun saat pertama dipakai"""
+        if BatchDES._array_tables is None:
+            BatchDES._array_tables = (
+                np.array(FastDES.IP_TABLES, dtype=np.uint64),
+                np.array(FastDES.FP_TABLES, dtype=np.uint64),
+                [np.array(table, dtype=np.uint64) for table in FastDES.SP_PAIRS],
+            )
+        return BatchDES._array_tables
+
+    def _crypt_array(self, blocks, schedule):
+        """Menjalankan DES pada array uint64 (satu elemen = satu blok, nilai big-endian)"""
+        ip_tables, fp_tables, (SP02, SP46, SP13, SP57) = self._numpy_tables()
+        u64 = np.uint64
+        byte, mask14, mask32, dup = u64(255), u64(16383), u64(0xFFFFFFFF), u64(0x100000001)
+        s2, s14, s18, s30 = u64(2), u64(14), u64(18), u64(30)
+
+        permuted = np.zeros_like(blocks)
+        for i in range(8):
+            permuted |= ip_tables[i][(blocks >> u64(56 - 8 * i)) & byte]
+        L = (permuted >> u64(32)) * dup
+        R = (permuted & mask32) * dup
+
+        for stage in schedule:
+            for kx1, ky1, kx2, ky2 in stage:
+                t = R ^ u64(kx1)
+                u = R ^ u64(ky1)
+                L ^= (SP02[(t >> s18) & mask14] | SP46[(t >> s2) & mask14] |
+                      SP13[(u >> s14) & mask14] | SP57[(u >> s30) & mask14])
+                t = L ^ u64(kx2)
+                u = L ^ u64(ky2)
+                R ^= (SP02[(t >> s18) & mask14] | SP46[(t >> s2) & mask14] |
+                      SP13[(u >> s14) & mask14] | SP57[(u >> s30) & mask14])
+            L, R = R, L
+
+        result = np.zeros_like(blocks)
+        for i in range(4):
+            shift = u64(24 - 8 * i)
+            result |= fp_tables[i][(L >> shift) & byte]
+            result |= fp_tables[4 + i][(R >> shift) & byte]
+        return result
+
+    def _crypt_into(self, data, out, schedule) -> None:
+        """Seperti FastDES._crypt_into, tetapi tervektorisasi untuk input besar"""
+        count = len(data) // 8
+        if np is None or count < self.BATCH_MIN_BLOCKS:
+            super()._crypt_into(data, out, schedule)
+            return
+
+        source = np.frombuffer(data, dtype='>u8', count=count)
+        target = np.frombuffer(out, dtype='>u8', count=count)
+        for start in range(0, count, self.BATCH_CHUNK_BLOCKS):
+            end = start + self.BATCH_CHUNK_BLOCKS
+            target[start:end] = self._crypt_array(source[start:end].astype(np.uint64), schedule)
+
+    def encrypt_blocks(self, blocks, key: str):
+        """Enkripsi array uint64 (tanpa padding), mengembalikan array uint64 baru"""
+        self._check_key(key)
+        forward, _ = self._key_schedules(key)
+        return self._crypt_array(np.asarray(blocks, dtype=np.uint64), forward)
+
+    def decrypt_blocks(self, blocks, key: str):
+        """Dekripsi array uint64 (tanpa padding), mengembalikan array uint64 baru"""
+        self._check_key(key)
+        _, reverse = self._key_schedules(key)
+        return self._crypt_array(np.asarray(blocks, dtype=np.uint64), reverse)
+
+
+class TripleDES(FastDES):
+    """Triple-DES (EDE) di atas mesin FastDES: C = E_K3(D_K2(E_K1(P))).
+
+    Kunci 16 karakter untuk 2-key (K3 = K1) atau 24 karakter untuk 3-key.
+    Ketiga jadwal subkunci disimpan sebagai satu jadwal tiga tahap di cache,
+    dan setiap blok hanya melewati IP sekali dan FP sekali karena pasangan
+    FP/IP di antara tahap saling membatalkan. Semua entry point bytes, CBC,
+    CTR dan with_key() dari DES berlaku juga untuk class ini.
+    """
+
+    @staticmethod
+    def _check_key(key: str) -> None:
+        if len(key) not in (16, 24):
+            raise ValueError("Kunci 3DES harus tepat 16 (2-key) atau 24 (3-key) karakter.")
+
+    def _expand_key(self, key: str) -> Tuple[_Stages, _Stages]:
+        """Ekspansi K1, K2, K3 menjadi jadwal tiga tahap maju (E-D-E) dan mundur (D-E-D)"""
+        parts = [key[i:i + 8] for i in range(0, len(key), 8)]
+        if len(parts) == 2:
+            parts.append(parts[0])
+
+        round_keys = {}
+        for part in parts:
+            if part not in round_keys:
+                round_keys[part] = self._round_keys(part)
+        rk1, rk2, rk3 = (round_keys[part] for part in parts)
+
+        pair = self._pair_rounds
+        forward = (pair(rk1), pair(rk2[::-1]), pair(rk3))
+        reverse = (pair(rk3[::-1]), pair(rk2), pair(rk1[::-1]))
+        return forward, reverse
+
+
+class BatchTripleDES(TripleDES, BatchDES):
+    """TripleDES dengan mode batch NumPy dari BatchDES (kembali ke mesin skalar tanpa NumPy)"""
+
+
+# Cipher milik proses worker ParallelDES, diisi oleh _parallel_worker_init
+_parallel_cipher = None
+
+
+def _parallel_worker_init(engine_cls, key: str) -> None:
+    """Initializer worker: ekspansi jadwal subkunci sekali per proses"""
+    global _parallel_cipher
+    _parallel_cipher = engine_cls.with_key(key)
+
+
+def _parallel_worker_ready() -> bool:
+    return _parallel_cipher is not None
+
+
+def _attach_shared_memory(name: str):
+    """Membuka segmen shared memory milik proses induk dari dalam worker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Worker berbagi resource tracker dengan induk (lihat ParallelDES.__init__),
+        # sehingga pendaftaran ulang tidak membuat segmen di-unlink dua kali
+        return shared_memory.SharedMemory(name=name)
+
+
+def _parallel_worker_task(input_name: str, output_name: str, start: int, end: int, operation: str,
+                          nonce: bytes = None) -> int:
+    """Memproses rentang [start, end) dari shared memory input ke shared memory output"""
+    source = _attach_shared_memory(input_name)
+    target = _attach_shared_memory(output_name)
+    try:
+        engine = _parallel_cipher.engine
+        with source.buf[start:end] as data, target.buf[start:end] as out:
+            if operation == 'encrypt':
+                engine._crypt_into(data, out, _parallel_cipher.forward)
+            elif operation == 'decrypt':
+                engine._crypt_into(data, out, _parallel_cipher.reverse)
+            else:
+                out[:] = engine._ctr_crypt(data, nonce, start, _parallel_cipher.forward)
+    finally:
+        source.close()
+        target.close()
+    return end - start
+
+
+class ParallelDES:
+    """Front end multi-core untuk ECB dan CTR di atas sebuah engine DES.
+
+    Input dipecah menjadi potongan kelipatan blok, diproses oleh pool proses
+    persisten yang jadwal subkuncinya sudah diekspansi saat worker dimulai,
+    lalu digabung kembali sesuai urutan. Data input dan output dipertukarkan
+    melalui shared memory, sehingga hanya nama segmen dan offset yang dikirim
+    ke worker. Input di bawah `min_parallel_size` diproses langsung di proses
+    pemanggil.
+    """
+
+    CHUNK_SIZE = 1 << 20
+    MIN_PARALLEL_SIZE = 1 << 20
+
+    def __init__(self, key: str, engine_cls=FastDES, workers: int = None, chunk_size: int = None,
+                 min_parallel_size: int = None):
+        self.cipher = engine_cls.with_key(key)
+        self.workers = workers or os.cpu_count() or 1
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        self.chunk_size = max(8, chunk_size - chunk_size % 8)
+        self.min_parallel_size = self.MIN_PARALLEL_SIZE if min_parallel_size is None else min_parallel_size
+        resource_tracker.ensure_running()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_parallel_worker_init,
+                                         initargs=(engine_cls, key))
+        # Pemanasan: memulai semua worker (dan ekspansi kunci) sebelum data pertama datang
+        for future in [self._pool.submit(_parallel_worker_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def _run(self, data, output_length: int, operation: str, nonce: bytes = None) -> bytearray:
+        """Menyalin input ke shared memory, menyebar potongan ke worker, dan mengumpulkan output"""
+        length = len(data)
+        source = shared_memory.SharedMemory(create=True, size=max(output_length, 1))
+        target = shared_memory.SharedMemory(create=True, size=max(output_length, 1))
+        try:
+            source.buf[:length] = data
+            if operation == 'encrypt':
+                # Padding PKCS#7 langsung di buffer input
+                full_length = length - length % 8
+                source.buf[full_length:output_length] = self.cipher.engine._pad(bytes(data[full_length:]))
+
+            futures = [self._pool.submit(_parallel_worker_task, source.name, target.name, start,
+                                         min(start + self.chunk_size, output_length), operation, nonce)
+                       for start in range(0, output_length, self.chunk_size)]
+            for future in futures:
+                future.result()
+            return bytearray(target.buf[:output_length])
+        finally:
+            source.close()
+            source.unlink()
+            target.close()
+            target.unlink()
+
+    def encrypt_ecb(self, data: bytes) -> bytes:
+        """Enkripsi ECB + padding PKCS#7, identik dengan DES.encrypt_bytes."""
+        if len(data) < self.min_parallel_size:
+            return self.cipher.encrypt_bytes(data)
+        return bytes(self._run(data, len(data) - len(data) % 8 + 8, 'encrypt'))
+
+    def decrypt_ecb(self, data: bytes) -> bytes:
+        """Dekripsi ECB dan menghapus padding, identik dengan DES.decrypt_bytes."""
+        if len(data) < self.min_parallel_size:
+            return self.cipher.decrypt_bytes(data)
+        if len(data) % 8 != 0:
+            raise ValueError("Ciphertext harus kelipatan 8 byte.")
+        out = self._run(data, len(data), 'decrypt')
+        del out[len(out) - self.cipher.engine._pad_length(out):]
+        return bytes(out)
+
+    def ctr_crypt(self, data: bytes, nonce: bytes) -> bytes:
+        """XOR `data` dengan keystream CTR mulai dari offset 0 untuk `nonce`."""
+        if len(data) < self.min_parallel_size:
+            return self.cipher.ctr_crypt(data, nonce)
+        if len(nonce) != self.cipher.engine.NONCE_SIZE:
+            raise ValueError(f"Nonce harus tepat {self.cipher.engine.NONCE_SIZE} byte.")
+        return bytes(self._run(data, len(data), 'ctr', bytes(nonce)))
+
+    def encrypt_ctr(self, data: bytes, nonce: bytes = None) -> bytes:
+        """Enkripsi CTR, output nonce + ciphertext seperti DES.encrypt_ctr."""
+        if nonce is None:
+            nonce = os.urandom(self.cipher.engine.NONCE_SIZE)
+        return bytes(nonce) + self.ctr_crypt(data, nonce)
+
+    def decrypt_ctr(self, data: bytes) -> bytes:
+        """Dekripsi output encrypt_ctr (nonce + ciphertext)."""
+        size = self.cipher.engine.NONCE_SIZE
+        if len(data) < size:
+            raise ValueError("Data CTR harus diawali nonce.")
+        data_view = memoryview(data)
+        return self.ctr_crypt(data_view[size:], data_view[:size])
+
+    def close(self) -> None:
+        """Menghentikan pool proses worker"""
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StageProfiler:
+    """Instrumentasi opsional untuk tahap-tahap DES: jumlah panggilan dan total waktu (ns).
+
+    Saat aktif, method pada DES dan semua subclass-nya dibungkus dengan
+    penghitung `perf_counter_ns`; saat nonaktif, method asli dipasang kembali
+    sehingga hot path tidak membayar biaya apa pun. Waktu bersifat inklusif
+    (misalnya `_f_function` sudah termasuk `_permute` di dalamnya), dan
+    panggilan bersarang ke tahap yang sama (super()) hanya dihitung sekali.
+
+    Aktifkan dengan context manager::
+
+        with StageProfiler() as profiler:
+            DES().encrypt("pesan", "kunci123")
+        print(profiler.report())
+
+    atau untuk seluruh proses dengan variabel lingkungan DES_PROFILE=table/json
+    (ringkasan ditulis ke stderr, atau ke file DES_PROFILE_OUTPUT, saat keluar).
+    """
+
+    STAGES = ('_expand_key', '_generate_subkeys', '_bytes_to_bits', '_bits_to_bytes', '_crypt_into',
+              '_crypt_block', '_f_function', '_permute', '_pad', '_unpad', '_pad_length',
+              '_encode_text', '_decode_text', '_hex_encode', '_hex_decode')
+
+    # Hanya satu profiler yang boleh memasang wrapper pada satu waktu
+    _installed = None
+    _install_lock = threading.Lock()
+
+    def __init__(self, stages=STAGES):
+        self.stages = tuple(stages)
+        self._counts = dict.fromkeys(self.stages, 0)
+        self._totals = dict.fromkeys(self.stages, 0)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._originals = []
+
+    @staticmethod
+    def _engine_classes() -> List[type]:
+        classes, pending = [], [DES]
+        while pending:
+            cls = pending.pop()
+            if cls not in classes:
+                classes.append(cls)
+                pending.extend(cls.__subclasses__())
+        return classes
+
+    def _wrap(self, stage: str, func):
+        local, lock, counts, totals = self._local, self._lock, self._counts, self._totals
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = local.__dict__.setdefault('active', set())
+            if stage in active:
+                return func(*args, **kwargs)
+            active.add(stage)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                active.discard(stage)
+                with lock:
+                    counts[stage] += 1
+                    totals[stage] += elapsed
+        return wrapper
+
+    def enable(self) -> 'StageProfiler':
+        """Memasang wrapper pada semua engine DES"""
+        with self._install_lock:
+            if StageProfiler._installed is not None:
+                raise RuntimeError("StageProfiler lain sedang aktif.")
+            StageProfiler._installed = self
+            for cls in self._engine_classes():
+                for stage in self.stages:
+                    original = cls.__dict__.get(stage)
+                    if original is None:
+                        continue
+                    if isinstance(original, staticmethod):
+                        wrapped = staticmethod(self._wrap(stage, original.__func__))
+                    else:
+                        wrapped = self._wrap(stage, original)
+                    self._originals.append((cls, stage, original))
+                    setattr(cls, stage, wrapped)
+        return self
+
+    def disable(self) -> None:
+        """Memasang kembali method asli"""
+        with self._install_lock:
+            if StageProfiler._installed is not self:
+                return
+            for cls, stage, original in reversed(self._originals):
+                setattr(cls, stage, original)
+            self._originals.clear()
+            StageProfiler._installed = None
+
+    def reset(self) -> None:
+        with self._lock:
+            for stage in self.stages:
+                self._counts[stage] = 0
+                self._totals[stage] = 0
+
+    def totals(self) -> dict:
+        """{tahap: {'calls': n, 'total_ns': t}} untuk tahap yang pernah dipanggil"""
+        with self._lock:
+            return {stage: {'calls': self._counts[stage], 'total_ns': self._totals[stage]}
+                    for stage in self.stages if self._counts[stage]}
+
+    def report(self, fmt: str = 'table') -> str:
+        """Ringkasan dalam bentuk tabel teks atau JSON"""
+        totals = self.totals()
+        if fmt == 'json':
+            return json.dumps(totals, indent=2)
+
+        lines = [f"{'Tahap':<18} {'Panggilan':>12} {'Total (ms)':>12} {'Rata-rata (us)':>15}"]
+        for stage, stats in sorted(totals.items(), key=lambda item: -item[1]['total_ns']):
+            lines.append(f"{stage:<18} {stats['calls']:>12,} {stats['total_ns'] / 1e6:>12.3f} "
+                         f"{stats['total_ns'] / stats['calls'] / 1e3:>15.3f}")
+        return '\n'.join(lines)
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+
+def _profile_from_env() -> None:
+    """Mengaktifkan StageProfiler untuk seluruh proses jika DES_PROFILE di-set"""
+    fmt = os.environ.get('DES_PROFILE', '').strip().lower()
+    if fmt in ('', '0', 'false', 'no'):
+        return
+    fmt = 'json' if fmt == 'json' else 'table'
+    profiler = StageProfiler().enable()
+
+    def dump():
+        profiler.disable()
+        path = os.environ.get('DES_PROFILE_OUTPUT')
+        if path:
+            with open(path, 'w') as f:
+                f.write(profiler.report(fmt) + '\n')
+        else:
+            print(profiler.report(fmt), file=sys.stderr)
+
+    atexit.register(dump)
+
+
+_profile_from_env()
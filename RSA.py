@@ -3,15 +3,49 @@
 import random
 import math
 import base64
-from typing import Tuple
+import hashlib
+import multiprocessing
+import os
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import repeat
+from typing import Dict, List, NamedTuple, Tuple
 
 # --- FUNGSI MATEMATIKA DASAR UNTUK RSA ---
 
-def is_prime(n, k=5):
-    """Sederhana Miller-Rabin test untuk memeriksa bilangan prima (untuk demo)"""
+def small_primes(limit):
+    """Semua bilangan prima < limit (Saringan Eratosthenes)"""
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b'\x00\x00'
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i*i::i] = bytes(len(range(i*i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+# Bilangan prima kecil untuk trial division dan saringan kandidat
+SMALL_PRIMES = small_primes(2048)
+
+# Ukuran jendela saringan (jumlah kandidat ganjil) per langkah pencarian
+SIEVE_WINDOW = 4096
+
+def miller_rabin_rounds(bits):
+    """Jumlah ronde Miller-Rabin untuk peluang salah < 2^-80 pada bilangan acak berukuran `bits`"""
+    for min_bits, rounds in ((3747, 3), (1345, 4), (476, 5), (400, 6), (347, 7), (308, 8), (55, 27)):
+        if bits >= min_bits:
+            return rounds
+    return 34
+
+def is_prime(n, k=None):
+    """Trial division dengan bilangan prima kecil, lalu Miller-Rabin (k ronde, default menurut ukuran bit)"""
     if n <= 1: return False
-    if n <= 3: return True
-    if n % 2 == 0: return False
+    for small in SMALL_PRIMES:
+        if n % small == 0:
+            return n == small
+    if n < SMALL_PRIMES[-1] ** 2: return True
+    if k is None:
+        k = miller_rabin_rounds(n.bit_length())
     
     # Tulis n-1 sebagai 2^r * d
     r, d = 0, n - 1
@@ -35,14 +69,79 @@ def is_prime(n, k=5):
             
     return True
 
-def generate_large_prime(bits):
-    """Menghasilkan bilangan prima N-bit acak"""
+def sieve_candidates(start, window=SIEVE_WINDOW):
+    """Kandidat start, start+2, ... (start ganjil) yang lolos saringan bilangan prima kecil"""
+    alive = bytearray([1]) * window
+    for small in SMALL_PRIMES[1:]:
+        # Indeks j pertama dengan start + 2j habis dibagi `small`
+        j = (-start * ((small + 1) // 2)) % small
+        alive[j::small] = bytes(len(range(j, window, small)))
+    return [start + 2 * j for j in range(window) if alive[j]]
+
+def generate_large_prime(bits, cancel=None):
+    """Menghasilkan bilangan prima N-bit acak.
+
+    Titik awal acak dinaikkan bertahap per jendela kandidat ganjil; kandidat
+    yang habis dibagi bilangan prima kecil dibuang dengan saringan sebelum
+    satu pun eksponensiasi modular (Miller-Rabin) dijalankan. Jika `cancel`
+    (Event) di-set, pencarian berhenti dan mengembalikan None.
+    """
+    if bits <= SMALL_PRIMES[-1].bit_length() + 1:
+        # Bilangan kecil: cukup coba acak satu per satu
+        while True:
+            p = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+            if is_prime(p):
+                return p
+    
+    rounds = miller_rabin_rounds(bits)
     while True:
-        p = random.getrandbits(bits)
-        if p.bit_length() != bits:
-            p = random.getrandbits(bits) | (1 << (bits - 1)) | 1 # Pastikan panjang bit dan ganjil
-        if is_prime(p):
-            return p
+        start = random.getrandbits(bits) | (1 << (bits - 1)) | 1 # Pastikan panjang bit dan ganjil
+        while start.bit_length() == bits:
+            for candidate in sieve_candidates(start):
+                if cancel is not None and cancel.is_set():
+                    return None
+                if candidate.bit_length() != bits:
+                    break
+                if is_prime(candidate, rounds):
+                    return candidate
+            start += 2 * SIEVE_WINDOW
+
+# Event pembatalan milik proses worker, diisi oleh _prime_worker_init
+_prime_cancel = None
+
+def _prime_worker_init(cancel):
+    global _prime_cancel
+    _prime_cancel = cancel
+    # Worker hasil fork mewarisi state random induk, harus di-seed ulang
+    random.seed()
+
+def _prime_worker_search(bits):
+    return generate_large_prime(bits, _prime_cancel)
+
+def generate_primes_parallel(bits, count=2, workers=None) -> List[int]:
+    """Mencari `count` bilangan prima N-bit berbeda secara paralel di pool proses.
+
+    Setiap worker menjalankan pencarian kandidat sendiri; begitu cukup
+    bilangan prima ditemukan, Event pembatalan di-set sehingga worker lain
+    berhenti di kandidat berikutnya.
+    """
+    workers = workers or os.cpu_count() or 1
+    cancel = multiprocessing.Event()
+    primes = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_prime_worker_init,
+                             initargs=(cancel,)) as pool:
+        pending = {pool.submit(_prime_worker_search, bits) for _ in range(workers)}
+        while len(primes) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                prime = future.result()
+                if prime not in primes:
+                    primes.append(prime)
+            # Worker yang selesai langsung diberi pencarian baru jika masih kurang
+            if len(primes) < count:
+                pending |= {pool.submit(_prime_worker_search, bits) for _ in done}
+        cancel.set()
+    return primes[:count]
 
 def extended_gcd(a, b) -> Tuple[int, int, int]:
     """Algoritma Euclidean Diperluas: ax + by = gcd(a, b)"""
@@ -61,71 +160,286 @@ def mod_inverse(a, m):
         raise Exception('Invers modular tidak ada')
     return (x % m + m) % m
 
+def recover_prime_factors(n, e, d) -> Tuple[int, int]:
+    """Memulihkan p dan q dari (n, e, d), untuk kunci privat yang hanya menyimpan (n, d)"""
+    k = d * e - 1
+    t = k
+    while t % 2 == 0:
+        t //= 2
+    
+    for _ in range(100):
+        g = random.randint(2, n - 2)
+        x = pow(g, t, n)
+        # Cari akar kuadrat non-trivial dari 1 mod n
+        while x != 1 and x != n - 1:
+            y = pow(x, 2, n)
+            if y == 1:
+                p = math.gcd(x - 1, n)
+                return p, n // p
+            x = y
+    raise ValueError("Gagal memfaktorkan modulus dari kunci privat.")
+
+# --- KUNCI PRIVAT (CRT) ---
+
+class RSAPrivateKey(NamedTuple):
+    """Kunci privat yang sudah di-parse, beserta parameter CRT"""
+    n: int
+    e: int
+    d: int
+    p: int
+    q: int
+    dP: int    # d mod (p-1)
+    dQ: int    # d mod (q-1)
+    qInv: int  # q^-1 mod p
+
+    @classmethod
+    def from_primes(cls, p, q, e) -> 'RSAPrivateKey':
+        d = mod_inverse(e, (p - 1) * (q - 1))
+        return cls(p * q, e, d, p, q, d % (p - 1), d % (q - 1), mod_inverse(q, p))
+
+    @classmethod
+    def from_pem(cls, private_key_pem: str, e: int) -> 'RSAPrivateKey':
+        """Mem-parse format "N:BASE64(n),D:BASE64(d)" dan memulihkan p, q untuk CRT"""
+        try:
+            parts = private_key_pem.split(',')
+            n = int(base64.b64decode(parts[0].split(':')[1]).decode())
+            d = int(base64.b64decode(parts[1].split(':')[1]).decode())
+        except (IndexError, ValueError):
+            raise ValueError("Format Private Key tidak valid.")
+        p, q = recover_prime_factors(n, e, d)
+        return cls.from_primes(max(p, q), min(p, q), e)
+
+    def decrypt_int(self, c: int) -> int:
+        """m = c^d mod n dengan Chinese Remainder Theorem (dua pow setengah ukuran)"""
+        m1 = pow(c, self.dP, self.p)
+        m2 = pow(c, self.dQ, self.q)
+        h = (self.qInv * (m1 - m2)) % self.p
+        return m2 + h * self.q
+
+# --- FORMAT BINER KUNCI PUBLIK DAN CIPHERTEXT ---
+#
+# Kunci publik : versi (1 byte) + n + e, tiap integer = panjang (2 byte) + big-endian
+#                atau DER RSAPublicKey (PKCS#1: SEQUENCE { INTEGER n, INTEGER e })
+# Ciphertext   : versi (1 byte) + c big-endian dengan panjang tetap = ukuran modulus
+# Di atas teks (protokol handshake) keduanya dikirim sebagai base64. Format lama
+# ("N:BASE64(desimal),E:..." dan base64 dari str(c)) tetap diterima.
+
+WIRE_VERSION = 1
+WIRE_FORMATS = ('binary', 'der', 'legacy')
+_INT_LENGTH = struct.Struct('!H')
+
+def int_to_bytes(value) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8 or 1, 'big')
+
+def _der_length(length) -> bytes:
+    if length < 0x80:
+        return bytes([length])
+    raw = int_to_bytes(length)
+    return bytes([0x80 | len(raw)]) + raw
+
+def _der_integer(value) -> bytes:
+    raw = int_to_bytes(value)
+    if raw[0] & 0x80:
+        raw = b'\x00' + raw # INTEGER DER bertanda, tambahkan 0 agar tetap positif
+    return b'\x02' + _der_length(len(raw)) + raw
+
+def _der_read(data, offset, tag) -> Tuple[bytes, int]:
+    """Membaca satu elemen DER dengan `tag`, mengembalikan (isi, offset berikutnya)"""
+    if data[offset] != tag:
+        raise ValueError("Tag DER tidak sesuai.")
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7f
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    if offset + length > len(data):
+        raise ValueError("Data DER terpotong.")
+    return data[offset:offset + length], offset + length
+
+def encode_public_key(n, e, der=False) -> bytes:
+    """Kunci publik dalam format biner berversi, atau DER jika der=True"""
+    if der:
+        body = _der_integer(n) + _der_integer(e)
+        return b'\x30' + _der_length(len(body)) + body
+    parts = [bytes([WIRE_VERSION])]
+    for value in (n, e):
+        raw = int_to_bytes(value)
+        parts.append(_INT_LENGTH.pack(len(raw)))
+        parts.append(raw)
+    return b''.join(parts)
+
+def decode_public_key(data: bytes) -> Tuple[int, int]:
+    """Kebalikan encode_public_key (format dikenali dari byte pertama)"""
+    try:
+        if data[0] == 0x30:
+            body, _ = _der_read(data, 0, 0x30)
+            n_raw, offset = _der_read(body, 0, 0x02)
+            e_raw, _ = _der_read(body, offset, 0x02)
+            return int.from_bytes(n_raw, 'big'), int.from_bytes(e_raw, 'big')
+        if data[0] != WIRE_VERSION:
+            raise ValueError(f"Versi format kunci tidak dikenal: {data[0]}")
+        values, offset = [], 1
+        for _ in range(2):
+            (length,) = _INT_LENGTH.unpack_from(data, offset)
+            offset += _INT_LENGTH.size
+            if offset + length > len(data):
+                raise ValueError("Data kunci terpotong.")
+            values.append(int.from_bytes(data[offset:offset + length], 'big'))
+            offset += length
+        return values[0], values[1]
+    except (IndexError, struct.error):
+        raise ValueError("Data kunci terpotong.")
+
+def encode_ciphertext(c, size) -> bytes:
+    return bytes([WIRE_VERSION]) + c.to_bytes(size, 'big')
+
+def decode_ciphertext(data: bytes) -> int:
+    if not data or data[0] != WIRE_VERSION:
+        raise ValueError("Format ciphertext tidak dikenal.")
+    return int.from_bytes(data[1:], 'big')
+
+def public_key_fingerprint(public_key_pem: str) -> str:
+    """Sidik jari SHA-256 dari Public Key dalam bentuk transfernya"""
+    return hashlib.sha256(public_key_pem.encode()).hexdigest()
+
+class RSAPublicKey(NamedTuple):
+    """Public Key yang sudah di-parse"""
+    n: int
+    e: int
+    size: int        # panjang modulus dalam byte (= panjang ciphertext)
+    fingerprint: str
+
+class _PublicKeyCache:
+    """Cache LRU Public Key yang sudah di-parse, dengan kunci sidik jari"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, public_key_pem: str) -> RSAPublicKey:
+        fingerprint = public_key_fingerprint(public_key_pem)
+        with self._lock:
+            key = self._entries.get(fingerprint)
+            if key is not None:
+                self._entries.move_to_end(fingerprint)
+                return key
+        
+        if public_key_pem.startswith('N:'):
+            n, e = parse_legacy_public_key(public_key_pem)
+        else:
+            n, e = decode_public_key(base64.b64decode(public_key_pem))
+        key = RSAPublicKey(n, e, (n.bit_length() + 7) // 8, fingerprint)
+        with self._lock:
+            self._entries[fingerprint] = key
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+public_key_cache = _PublicKeyCache()
+
+def parse_legacy_public_key(public_key_pem: str) -> Tuple[int, int]:
+    """Format lama "N:BASE64(desimal n),E:BASE64(desimal e)"""
+    parts = public_key_pem.split(',')
+    n_str = parts[0].split(':')[1]
+    e_str = parts[1].split(':')[1]
+    
+    n = int(base64.b64decode(n_str).decode())
+    e = int(base64.b64decode(e_str).decode())
+    return n, e
+
+def generate_private_key(key_bits, e=65537, workers=None) -> RSAPrivateKey:
+    """Menghasilkan pasangan kunci RSA baru (p dan q paralel jika workers > 1)"""
+    
+    # 1. Pilih dua bilangan prima besar p dan q
+    if workers and workers > 1:
+        p, q = generate_primes_parallel(key_bits // 2, 2, workers)
+    else:
+        p = generate_large_prime(key_bits // 2)
+        q = generate_large_prime(key_bits // 2)
+    
+    # Pastikan p != q
+    while p == q:
+         q = generate_large_prime(key_bits // 2)
+
+    # 2-4. Hitung modulus n, phi(n) dan kunci privat d (invers modular e mod phi),
+    # sekaligus parameter CRT (dP, dQ, qInv)
+    return RSAPrivateKey.from_primes(p, q, e)
+
+# Jumlah penerima per tugas saat membungkus kunci sesi lewat executor
+WRAP_BATCH_SIZE = 64
+
 # --- CLASS RSA ENGINE ---
 
 class RSA_Engine:
     """Implementasi RSA From Scratch untuk distribusi kunci"""
     
-    def __init__(self, key_bits=256): # Menggunakan key_bits kecil agar cepat untuk demo
+    def __init__(self, key_bits=256, workers=None, wire_format='binary'): # Menggunakan key_bits kecil agar cepat untuk demo
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"wire_format harus salah satu dari {WIRE_FORMATS}.")
         self.key_bits = key_bits
+        self.wire_format = wire_format # Format Public Key dan ciphertext yang dikirim
+        self.workers = workers # > 1: p dan q dicari paralel di pool proses
         self.n = None
         self.e = 65537 # Kunci publik standar (umumnya digunakan)
         self.d = None
         self.public_key_pem = None
         self.private_key_pem = None # Untuk menyimpan (n, d)
+        self.private_key = None # RSAPrivateKey hasil parse private_key_pem (cache)
+        self._private_key_source = None
         
     def generate_key_pair(self) -> str:
         """Menghasilkan pasangan kunci (n, e, d)"""
         
-        # 1. Pilih dua bilangan prima besar p dan q
-        p = generate_large_prime(self.key_bits // 2)
-        q = generate_large_prime(self.key_bits // 2)
-        
-        # Pastikan p != q
-        while p == q:
-             q = generate_large_prime(self.key_bits // 2)
+        return self.use_private_key(generate_private_key(self.key_bits, self.e, self.workers))
 
-        # 2. Hitung modulus n
-        self.n = p * q
-        
-        # 3. Hitung Euler's totient phi(n)
-        phi = (p - 1) * (q - 1)
-        
-        # 4. Hitung kunci privat d (invers modular e mod phi)
-        self.d = mod_inverse(self.e, phi)
+    def use_private_key(self, private_key: RSAPrivateKey) -> str:
+        """Memakai pasangan kunci yang sudah ada (mis. dari KeyStore), mengembalikan Public Key"""
+        self.private_key = private_key
+        self.n, self.e, self.d = private_key.n, private_key.e, private_key.d
         
         # 5. Format kunci untuk transfer
         # Kunci Publik: (n, e)
         # Kunci Privat: (n, d)
         
-        # Kita akan menggunakan format sederhana "BASE64(n),BASE64(e)" untuk transfer
+        # Private Key internal tetap format sederhana "N:BASE64(n),D:BASE64(d)"
         n_b64 = base64.b64encode(str(self.n).encode()).decode()
         e_b64 = base64.b64encode(str(self.e).encode()).decode()
         d_b64 = base64.b64encode(str(self.d).encode()).decode()
         
-        # Menyimpan Public Key dan Private Key sebagai string untuk penggunaan internal
-        self.public_key_pem = f"N:{n_b64},E:{e_b64}"
+        # Public Key untuk transfer: base64 dari format biner (atau format lama)
+        if self.wire_format == 'legacy':
+            self.public_key_pem = f"N:{n_b64},E:{e_b64}"
+        else:
+            encoded = encode_public_key(self.n, self.e, der=self.wire_format == 'der')
+            self.public_key_pem = base64.b64encode(encoded).decode()
         self.private_key_pem = f"N:{n_b64},D:{d_b64}"
+        self._private_key_source = self.private_key_pem
         
         return self.public_key_pem
 
-    def load_public_key(self, public_key_pem: str) -> Tuple[int, int]:
-        """Memuat Public Key (n, e) dari format string"""
+    def parse_public_key(self, public_key_pem: str) -> RSAPublicKey:
+        """Public Key yang sudah di-parse, diambil dari cache sidik jari jika pernah dimuat"""
         try:
-            parts = public_key_pem.split(',')
-            n_str = parts[0].split(':')[1]
-            e_str = parts[1].split(':')[1]
-            
-            n = int(base64.b64decode(n_str).decode())
-            e = int(base64.b64decode(e_str).decode())
-            return n, e
-        except:
+            return public_key_cache.get(public_key_pem)
+        except Exception:
             raise ValueError("Format Public Key tidak valid.")
 
+    def load_public_key(self, public_key_pem: str) -> Tuple[int, int]:
+        """Memuat Public Key (n, e) dari format string (biner base64 atau format lama)"""
+        key = self.parse_public_key(public_key_pem)
+        return key.n, key.e
+
 
     def encrypt_with_public_key(self, data_bytes: bytes, public_key_pem: str) -> str:
         """Enkripsi data (Secret Key DES) menggunakan Public Key penerima"""
-        n, e = self.load_public_key(public_key_pem)
+        key = self.parse_public_key(public_key_pem)
+        n, e = key.n, key.e
         
         # Konversi bytes data (kunci DES) ke integer (m)
         m = int.from_bytes(data_bytes, byteorder='big')
@@ -137,32 +451,69 @@ class RSA_Engine:
         # Enkripsi: c = m^e mod n
         c = pow(m, e, n)
         
-        # Mengembalikan ciphertext sebagai string base64 dari integer
-        return base64.b64encode(str(c).encode()).decode()
+        # Mengembalikan ciphertext sebagai string base64 (biner panjang tetap, atau str(c) untuk format lama)
+        if self.wire_format == 'legacy':
+            return base64.b64encode(str(c).encode()).decode()
+        return base64.b64encode(encode_ciphertext(c, key.size)).decode()
 
-    def decrypt_with_private_key(self, encrypted_b64: str) -> bytes:
-        """Dekripsi data menggunakan Private Key (n, d) milik sendiri"""
-        
-        # Load Private Key sendiri (n, d)
+    def load_private_key(self) -> RSAPrivateKey:
+        """Private Key milik sendiri; string private_key_pem hanya di-parse sekali"""
         if not self.private_key_pem:
              raise Exception("Private Key belum diinisialisasi.")
-             
-        parts = self.private_key_pem.split(',')
-        n_str = parts[0].split(':')[1]
-        d_str = parts[1].split(':')[1]
         
-        n = int(base64.b64decode(n_str).decode())
-        d = int(base64.b64decode(d_str).decode())
+        # Parse ulang hanya jika private_key_pem diganti dari luar
+        if self.private_key is None or self._private_key_source != self.private_key_pem:
+            self.private_key = RSAPrivateKey.from_pem(self.private_key_pem, self.e)
+            self._private_key_source = self.private_key_pem
+        return self.private_key
+
+    def decrypt_with_private_key(self, encrypted_b64: str) -> bytes:
+        """Dekripsi data menggunakan Private Key (n, d) milik sendiri"""
+        
+        # Load Private Key sendiri (sudah di-parse dan di-cache)
+        key = self.load_private_key()
         
-        # Konversi ciphertext base64 kembali ke integer (c)
-        c = int(base64.b64decode(encrypted_b64).decode())
+        # Konversi ciphertext base64 kembali ke integer (c); format lama berisi digit desimal
+        raw = base64.b64decode(encrypted_b64)
+        c = decode_ciphertext(raw) if raw[:1] == bytes([WIRE_VERSION]) else int(raw.decode())
         
-        # Dekripsi: m = c^d mod n
-        m = pow(c, d, n)
+        # Dekripsi: m = c^d mod n (via CRT)
+        m = key.decrypt_int(c)
         
         # Konversi integer m kembali ke bytes data (kunci DES, 8 byte)
         # Tentukan panjang kunci DES (8 byte)
         key_length = 8
         decrypted_bytes = m.to_bytes(key_length, byteorder='big')
         
-        return decrypted_bytes
\ No newline at end of file
+        return decrypted_bytes
+
+    def wrap_key_for_recipients(self, data_bytes: bytes, recipients: Dict[str, str], executor=None,
+                                batch_size=WRAP_BATCH_SIZE) -> dict:
+        """Membungkus satu kunci sesi untuk banyak penerima sekaligus.
+
+        `recipients` memetakan id client -> Public Key. Jika `executor`
+        (ThreadPoolExecutor/ProcessPoolExecutor) diberikan dan penerima lebih
+        dari `batch_size`, penerima dibagi per batch dan diproses paralel.
+        Hasilnya dict id client -> ciphertext base64; Public Key yang tidak
+        valid menghasilkan objek ValueError sebagai nilainya.
+        """
+        items = list(recipients.items())
+        if executor is None or len(items) <= batch_size:
+            return dict(_wrap_key_batch(data_bytes, self.wire_format, items))
+        
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        wrapped = {}
+        for results in executor.map(_wrap_key_batch, repeat(data_bytes), repeat(self.wire_format), batches):
+            wrapped.update(results)
+        return wrapped
+
+def _wrap_key_batch(data_bytes, wire_format, recipients) -> List[Tuple[str, object]]:
+    """Worker: membungkus kunci untuk satu batch (id client, Public Key)"""
+    engine = RSA_Engine(wire_format=wire_format)
+    results = []
+    for client_id, public_key_pem in recipients:
+        try:
+            results.append((client_id, engine.encrypt_with_public_key(data_bytes, public_key_pem)))
+        except ValueError as e:
+            results.append((client_id, e))
+    return results
@@ -0,0 +1,257 @@
+# async_server.py
+# Mode server asyncio: handshake dan semantik relay sama dengan server.py,
+# tetapi setiap koneksi cukup satu task (tanpa thread per arah, tanpa lock global),
+# sehingga ribuan koneksi idle/aktif dapat dilayani oleh satu proses.
+#
+# Room sama dengan server.py: client masuk room bernama atau dipasangkan otomatis
+# berdua, dan setiap room mendapat kunci sesi DES sendiri.
+#
+# Antrian keluar per penerima memakai buffer tulis transport asyncio dengan high/low
+# watermark yang sama seperti relay.OutboundQueue; drain() menjadi backpressure bagi
+# pengirim. Anggota ber-ID yang terputus ditampung di OutboundQueue sampai kembali.
+import asyncio
+import logging
+import sys
+
+import eventlog
+
+from protocol import (AsyncFrameReader, AsyncFrameWriter, ProtocolError, FRAME_STATUS, FRAME_HELLO,
+                      FRAME_SESSION_KEY, FRAME_DATA, FRAME_BYE)
+from relay import OutboundQueue, QUEUE_HIGH_WATERMARK, QUEUE_LOW_WATERMARK, QUEUE_MAX_BYTES
+from rooms import Member, RoomRegistry
+from server import (HOST, PORT, OFFLINE_GRACE, BACKPRESSURE_TIMEOUT, server_rsa, generate_des_key,
+                    parse_client_hello)
+
+# Batas waktu menunggu Public Key dari client (detik)
+PUBKEY_TIMEOUT = 3.0
+# Antrian koneksi yang belum di-accept
+BACKLOG = 4096
+
+# Nama logger sama dengan server.py sehingga sampling/batas laju berlaku untuk kedua mode
+log = logging.getLogger('server')
+relay_log = eventlog.EventLogger('server.relay')
+
+
+class AsyncRelayServer:
+    """Server relay berbasis asyncio.start_server"""
+
+    def __init__(self, host=HOST, port=PORT, verbose=True):
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self.accepted = 0
+        self.active = 0
+        self.rooms = RoomRegistry(key_factory=generate_des_key)
+
+    def log(self, message):
+        if self.verbose:
+            log.info(message)
+
+    async def _receive_pubkey(self, reader, label):
+        """Sama dengan receive_client_pubkey di server.py, tanpa memblokir thread"""
+        try:
+            frame = await asyncio.wait_for(reader.read_frame(), PUBKEY_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning(f"[SERVER WARN] Timeout menunggu Public Key dari {label}.")
+            return None, None, None
+        if frame is None or frame.type != FRAME_HELLO:
+            log.warning(f"[SERVER WARN] Frame HELLO tidak diterima dari {label}.")
+            return None, None, None
+        pubkey, room_name, client_id = parse_client_hello(frame.payload.decode('utf-8', errors='ignore'))
+        if not pubkey:
+            log.warning(f"[SERVER WARN] Data kunci publik tidak valid dari {label}.")
+            return None, None, None
+        self.log(f"[SERVER KEY] {label} Public Key diterima.")
+        return pubkey, room_name, client_id
+
+    @staticmethod
+    def _send(member, frame_type, payload=b''):
+        """Mengirim tanpa menunggu; False jika frame ditolak karena antrian penerima penuh"""
+        writer = member.writer
+        if isinstance(writer, OutboundQueue):
+            # Penerima offline
+            return writer.send(frame_type, payload)
+        buffered = writer.stream.transport.get_write_buffer_size()
+        if buffered and buffered + len(payload) > QUEUE_MAX_BYTES:
+            return False
+        writer.send(frame_type, payload)
+        return True
+
+    async def _drain(self, members):
+        """Backpressure: menunggu buffer tulis penerima online turun ke low watermark"""
+        waiters = [member.writer.stream.drain() for member in members
+                   if not isinstance(member.writer, OutboundQueue)]
+        if not waiters:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), BACKPRESSURE_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning(f"[SERVER WARN] Antrian penerima belum berkurang setelah {BACKPRESSURE_TIMEOUT:.0f} detik.")
+
+    def queue_depths(self):
+        """Kedalaman antrian keluar setiap anggota (byte di buffer transport atau antrian offline)"""
+        depths = {}
+        for member in self.rooms.members():
+            if isinstance(member.writer, OutboundQueue):
+                depths[member.label] = member.writer.stats()
+            else:
+                depths[member.label] = {'bytes': member.writer.stream.transport.get_write_buffer_size(),
+                                        'online': True}
+        return depths
+
+    async def _key_exchange(self, room, recipients):
+        """Membungkus kunci sesi room untuk para penerima di executor (loop tetap responsif)"""
+        loop = asyncio.get_running_loop()
+        wrapped = await loop.run_in_executor(
+            None, server_rsa.wrap_key_for_recipients, room.session_key.encode('utf-8'),
+            {member.label: member.pubkey for member in recipients})
+        for member in recipients:
+            if isinstance(wrapped[member.label], Exception):
+                log.error(f"[SERVER ERROR] Gagal mengenkripsi kunci untuk {member.label}: {wrapped[member.label]}")
+                continue
+            self._send(member, FRAME_SESSION_KEY, wrapped[member.label].encode('utf-8'))
+        await self._drain(recipients)
+        self.log(f"[SERVER KEY] Kunci DES room {room.name} dikirim ke {', '.join(m.label for m in recipients)}.")
+
+    async def _relay(self, reader, member):
+        """Setara relay_message: meneruskan frame DATA ke anggota lain di room hingga BYE"""
+        label = member.label
+        said_bye = False
+        try:
+            while True:
+                frame = await reader.read_frame()
+                if frame is None or frame.type == FRAME_BYE:
+                    said_bye = frame is not None
+                    self.log(f"[SERVER] {label} meminta keluar.")
+                    break
+                if frame.type != FRAME_DATA:
+                    self.log(f"[SERVER WARN] Frame tak terduga (jenis {frame.type}) dari {label}. Diabaikan.")
+                    continue
+                room = member.room
+                receivers = room.others(member) if room is not None else []
+                if not receivers:
+                    self.log(f"[SERVER WARN] Belum ada anggota lain di room {label}. Pesan diabaikan.")
+                    continue
+                if self.verbose:
+                    relay_log.info("[RELAY] [%s] Dari %s ke %s: %d byte ciphertext", room.name, label,
+                                   ', '.join(r.label for r in receivers), len(frame.payload))
+                for receiver in receivers:
+                    if not self._send(receiver, FRAME_DATA, frame.payload):
+                        log.warning(f"[SERVER WARN] Gagal mengirim ke {receiver.label}: antrian penuh")
+                await self._drain(receivers)
+        except (ConnectionError, ProtocolError) as e:
+            log.error(f"[SERVER ERROR] Koneksi {label} terputus: {e}")
+
+        if said_bye or member.key == member.label:
+            await self._notify_dissolved(self.rooms.leave(member))
+        else:
+            # Terputus tanpa pamit: pesan untuknya ditampung sampai kembali atau batas waktu habis
+            self.rooms.mark_offline(member)
+            member.writer = OutboundQueue()
+            self.log(f"[SERVER] {label} offline. Pesan diantrekan selama {OFFLINE_GRACE:.0f} detik.")
+            asyncio.get_running_loop().call_later(
+                OFFLINE_GRACE, lambda: asyncio.ensure_future(self._expire(member)))
+
+    async def _notify_dissolved(self, remaining):
+        """Room bubar: anggota tersisa diberi sinyal keluar"""
+        for other in remaining:
+            self.log(f"[SERVER] Room bubar. Memberi sinyal keluar ke {other.label}.")
+            if isinstance(other.writer, OutboundQueue):
+                other.writer.close()
+            elif not other.writer.stream.is_closing():
+                other.send(FRAME_BYE)
+        await self._drain(remaining)
+
+    async def _expire(self, member):
+        remaining = self.rooms.expire(member)
+        if remaining is None:
+            return
+        self.log(f"[SERVER] {member.label} tidak kembali dalam {OFFLINE_GRACE:.0f} detik. Dikeluarkan dari room.")
+        member.writer.close()
+        await self._notify_dissolved(remaining)
+
+    async def _resume(self, previous, member):
+        """Client ber-ID kembali: kunci sesi dulu, lalu pesan yang tertunda, lalu relay biasa"""
+        room = previous.room
+        await self._key_exchange(room, [member])
+        if self.rooms.replace(previous, member) is None:
+            raise ConnectionError(f"Room {room.name} sudah bubar.")
+        # Tanpa await sejak replace: tidak ada pesan baru yang masuk ke antrian lama
+        pending = previous.writer.take_all()
+        for frame_type, payload in pending:
+            member.send(frame_type, payload)
+        self.log(f"[SERVER] {member.label} kembali ke room {room.name} sebagai {member.key} "
+                 f"({len(pending)} pesan tertunda).")
+        await self._drain([member])
+
+    async def handle_client(self, reader, writer):
+        """Satu task per koneksi: status awal, Public Key, masuk room, lalu relay"""
+        self.accepted += 1
+        self.active += 1
+        label = f"Client {self.accepted}"
+        member = None
+        frames_in = AsyncFrameReader(reader)
+        frames_out = AsyncFrameWriter(writer)
+        writer.transport.set_write_buffer_limits(high=QUEUE_HIGH_WATERMARK, low=QUEUE_LOW_WATERMARK)
+        try:
+            self.log(f"[KONEKSI] {label} terhubung dari {writer.get_extra_info('peername')}")
+            frames_out.send(FRAME_STATUS, f"Berhasil terhubung sebagai {label}. Menunggu Public Key...".encode('utf-8'))
+            await writer.drain()
+
+            pubkey, room_name, client_id = await self._receive_pubkey(frames_in, label)
+            if pubkey is None:
+                return
+
+            member = Member(label, frames_out, pubkey, key=client_id)
+            previous = self.rooms.take_offline(client_id) if client_id else None
+            if previous is not None:
+                await self._resume(previous, member)
+            else:
+                recipients = self.rooms.join(member, room_name)
+                room = member.room
+                self.log(f"[SERVER] {label} masuk room {room.name} ({len(room.members)} anggota).")
+                if recipients:
+                    await self._key_exchange(room, recipients)
+
+            await self._relay(frames_in, member)
+        except Exception as e:
+            log.error(f"[SERVER ERROR] {label}: {e}")
+        finally:
+            if member is not None and member.online and member.room is not None:
+                self.rooms.leave(member)
+            self.active -= 1
+            writer.close()
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=BACKLOG)
+        log.info(f"[SERVER] Server asyncio berjalan di {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+
+def raise_fd_limit():
+    """Menaikkan batas file descriptor (soft) ke batas hard agar ribuan koneksi muat"""
+    try:
+        import resource
+    except ImportError:  # Bukan POSIX
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main():
+    eventlog.setup()
+    eventlog.install_dump_signal()
+    raise_fd_limit()
+    verbose = '--quiet' not in sys.argv[1:]
+    try:
+        asyncio.run(AsyncRelayServer(verbose=verbose).serve_forever())
+    except KeyboardInterrupt:
+        log.info("[SERVER] Server dimatikan.")
+    finally:
+        eventlog.shutdown()
+
+
+if __name__ == "__main__":
+    main()
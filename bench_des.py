@@ -0,0 +1,272 @@
+"""Benchmark engine DES: throughput (blok/s, MB/s), latensi p50/p99,
+cross-check ciphertext antar engine, dan pemeriksaan regresi terhadap baseline JSON.
+
+Contoh pemakaian:
+    python bench_des.py                                  # ukuran 8 B .. 1 MB
+    python bench_des.py --max-size 64M                   # sampai 64 MB
+    python bench_des.py --save-baseline bench_baseline.json
+    python bench_des.py --baseline bench_baseline.json   # gagal (exit 1) jika ada regresi
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from DES import DES, FastDES, BitslicedDES, BatchDES, TripleDES, BatchTripleDES, ParallelDES, np
+
+KEY = "kunci123"
+KEY_3DES = "kunci123rahasia!kunci456"
+
+SIZES = [8, 64, 1024, 64 * 1024, 1 << 20, 16 << 20, 64 << 20]
+DEFAULT_MAX_SIZE = 1 << 20
+MODES = ('HEX', 'ECB', 'CBC', 'CTR')
+SCHEDULES = ('warm', 'cold')
+DIRECTIONS = ('encrypt', 'decrypt')
+
+# DES referensi (list bit) sangat lambat, ukuran pesannya dibatasi
+ENGINE_MAX_SIZE = {'DES': 4096}
+PARALLEL_MODES = ('ECB', 'CTR')
+
+IV = bytes(8)
+NONCE = bytes(4)
+CROSS_CHECK_SIZES = (5, 100, 4099)
+
+
+def parse_size(text: str) -> int:
+    """Mengubah '64', '64K', '16M' menjadi jumlah byte"""
+    text = text.strip().upper()
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    if text and text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit, scale in (('M', 1 << 20), ('K', 1 << 10)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale}{unit}"
+    return f"{size}B"
+
+
+def available_engines(parallel: bool = False, workers: int = None) -> dict:
+    """Semua varian engine yang tersedia: nama -> (engine, kunci)"""
+    engines = {
+        'DES': (DES(), KEY),
+        'FastDES': (FastDES(), KEY),
+        'BitslicedDES': (BitslicedDES(), KEY),
+    }
+    if np is not None:
+        engines['BatchDES'] = (BatchDES(), KEY)
+    engines['TripleDES'] = (TripleDES(), KEY_3DES)
+    if np is not None:
+        engines['BatchTripleDES'] = (BatchTripleDES(), KEY_3DES)
+    if parallel:
+        engines['ParallelDES'] = (ParallelDES(KEY, workers=workers, min_parallel_size=0), KEY)
+    return engines
+
+
+def make_payload(mode: str, size: int):
+    """Pesan uji; mode HEX memakai teks ASCII karena API str meng-encode UTF-8"""
+    data = os.urandom(size)
+    if mode == 'HEX':
+        return data.translate(bytes(32 + i % 95 for i in range(256))).decode('ascii')
+    return data
+
+
+def encrypt_op(engine, key: str, mode: str):
+    """Fungsi enkripsi satu argumen untuk engine dan mode tertentu"""
+    if isinstance(engine, ParallelDES):
+        return {'ECB': engine.encrypt_ecb, 'CTR': lambda data: engine.encrypt_ctr(data, NONCE)}[mode]
+    return {
+        'HEX': lambda data: engine.encrypt(data, key),
+        'ECB': lambda data: engine.encrypt_bytes(data, key),
+        'CBC': lambda data: engine.encrypt_cbc(data, key, IV),
+        'CTR': lambda data: engine.encrypt_ctr(data, key, NONCE),
+    }[mode]
+
+
+def decrypt_op(engine, key: str, mode: str):
+    """Fungsi dekripsi satu argumen, pasangan dari encrypt_op"""
+    if isinstance(engine, ParallelDES):
+        return {'ECB': engine.decrypt_ecb, 'CTR': engine.decrypt_ctr}[mode]
+    return {
+        'HEX': lambda data: engine.decrypt(data, key),
+        'ECB': lambda data: engine.decrypt_bytes(data, key),
+        'CBC': lambda data: engine.decrypt_cbc(data, key),
+        'CTR': lambda data: engine.decrypt_ctr(data, key),
+    }[mode]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(func, argument, size: int, reset=None, budget: float = 0.5, min_rounds: int = 3,
+            max_rounds: int = 1000) -> dict:
+    """Menjalankan func(argument) berulang sampai `budget` detik dan menghitung statistiknya.
+
+    `reset` dipanggil di luar pengukuran sebelum tiap putaran (dipakai untuk
+    mengosongkan cache jadwal kunci pada skenario cold).
+    """
+    samples = []
+    elapsed = 0.0
+    while len(samples) < max_rounds and (elapsed < budget or len(samples) < min_rounds):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        func(argument)
+        samples.append(time.perf_counter() - start)
+        elapsed += samples[-1]
+
+    blocks = max(1, (size + 7) // 8)
+    return {
+        'rounds': len(samples),
+        'blocks_per_s': blocks * len(samples) / elapsed,
+        'mb_per_s': size * len(samples) / elapsed / 1e6,
+        'p50_ms': percentile(samples, 0.50) * 1e3,
+        'p99_ms': percentile(samples, 0.99) * 1e3,
+    }
+
+
+def cross_check(engines: dict) -> list:
+    """Memastikan semua engine menghasilkan ciphertext yang sama; mengembalikan daftar kesalahan"""
+    errors = []
+    single_ref = DES()
+    triple_ref = engines.get('TripleDES', (TripleDES(), KEY_3DES))[0]
+
+    for mode in MODES:
+        for size in CROSS_CHECK_SIZES:
+            payload = make_payload(mode, size)
+            expected = {
+                KEY: encrypt_op(single_ref, KEY, mode)(payload),
+                KEY_3DES: encrypt_op(triple_ref, KEY_3DES, mode)(payload),
+            }
+            # 3DES dengan tiga kunci identik harus sama dengan DES tunggal
+            if encrypt_op(triple_ref, KEY * 3, mode)(payload) != expected[KEY]:
+                errors.append(f"TripleDES(K,K,K) != DES untuk mode {mode}, {size} B")
+
+            for name, (engine, key) in engines.items():
+                if isinstance(engine, ParallelDES) and mode not in PARALLEL_MODES:
+                    continue
+                ciphertext = encrypt_op(engine, key, mode)(payload)
+                if ciphertext != expected[key]:
+                    errors.append(f"{name}: ciphertext berbeda untuk mode {mode}, {size} B")
+                elif decrypt_op(engine, key, mode)(ciphertext) != payload:
+                    errors.append(f"{name}: dekripsi gagal untuk mode {mode}, {size} B")
+    return errors
+
+
+def run_benchmarks(engines: dict, modes, sizes, schedules, budget: float, min_rounds: int) -> dict:
+    """Menjalankan semua kombinasi engine/mode/arah/jadwal/ukuran"""
+    results = {}
+    for name, (engine, key) in engines.items():
+        parallel = isinstance(engine, ParallelDES)
+        for mode in modes:
+            if parallel and mode not in PARALLEL_MODES:
+                continue
+            for size in sizes:
+                if size > ENGINE_MAX_SIZE.get(name, size):
+                    continue
+                payload = make_payload(mode, size)
+                ciphertext = encrypt_op(engine, key, mode)(payload)
+                for schedule in schedules:
+                    # ParallelDES mengikat kunci saat dibuat, tidak punya skenario cold
+                    if parallel and schedule == 'cold':
+                        continue
+                    reset = type(engine).cache_clear if schedule == 'cold' else None
+                    for direction in DIRECTIONS:
+                        if direction == 'encrypt':
+                            func, argument = encrypt_op(engine, key, mode), payload
+                        else:
+                            func, argument = decrypt_op(engine, key, mode), ciphertext
+                        stats = measure(func, argument, size, reset, budget, min_rounds)
+                        case = f"{name}/{mode}/{direction}/{schedule}/{format_size(size)}"
+                        results[case] = stats
+                        print(f"{case:<44} {stats['blocks_per_s']:>14,.0f} blok/s {stats['mb_per_s']:>9.3f} MB/s "
+                              f"p50 {stats['p50_ms']:>10.3f} ms  p99 {stats['p99_ms']:>10.3f} ms")
+    return results
+
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """Kasus yang throughput-nya turun lebih dari `tolerance` dibanding baseline"""
+    regressions = []
+    for case, reference in baseline.get('results', {}).items():
+        current = results.get(case)
+        if current is None or reference['mb_per_s'] <= 0:
+            continue
+        ratio = current['mb_per_s'] / reference['mb_per_s']
+        if ratio < 1 - tolerance:
+            regressions.append(f"{case}: {current['mb_per_s']:.3f} MB/s vs baseline "
+                               f"{reference['mb_per_s']:.3f} MB/s ({ratio:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dan cross-check engine DES")
+    parser.add_argument('--engines', help="daftar engine dipisah koma (default: semua)")
+    parser.add_argument('--modes', default=','.join(MODES), help="daftar mode dipisah koma")
+    parser.add_argument('--sizes', help="daftar ukuran pesan, mis. 8,1K,1M (default: 8 B .. --max-size)")
+    parser.add_argument('--max-size', default=format_size(DEFAULT_MAX_SIZE), help="ukuran maksimum (mis. 64M)")
+    parser.add_argument('--schedules', default=','.join(SCHEDULES), help="warm, cold, atau keduanya")
+    parser.add_argument('--budget', type=float, default=0.5, help="detik per kasus")
+    parser.add_argument('--min-rounds', type=int, default=3, help="putaran minimum per kasus")
+    parser.add_argument('--parallel', action='store_true', help="ikut mengukur ParallelDES")
+    parser.add_argument('--workers', type=int, help="jumlah worker ParallelDES")
+    parser.add_argument('--baseline', help="file baseline JSON untuk pemeriksaan regresi")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="penurunan maksimum yang diizinkan")
+    parser.add_argument('--save-baseline', help="menyimpan hasil sebagai baseline JSON")
+    parser.add_argument('--skip-check', action='store_true', help="lewati cross-check ciphertext")
+    args = parser.parse_args(argv)
+
+    engines = available_engines(args.parallel, args.workers)
+    if args.engines:
+        wanted = args.engines.split(',')
+        unknown = set(wanted) - set(engines)
+        if unknown:
+            parser.error(f"engine tidak dikenal/tersedia: {', '.join(sorted(unknown))}")
+        engines = {name: engines[name] for name in wanted}
+
+    if args.sizes:
+        sizes = [parse_size(size) for size in args.sizes.split(',')]
+    else:
+        max_size = parse_size(args.max_size)
+        sizes = [size for size in SIZES if size <= max_size]
+
+    try:
+        if not args.skip_check:
+            errors = cross_check(engines)
+            for error in errors:
+                print(f"[CROSS-CHECK GAGAL] {error}")
+            if errors:
+                return 1
+            print(f"[CROSS-CHECK] {len(engines)} engine menghasilkan ciphertext identik.")
+
+        results = run_benchmarks(engines, args.modes.split(','), sizes, args.schedules.split(','),
+                                 args.budget, args.min_rounds)
+    finally:
+        for engine, _ in engines.values():
+            if isinstance(engine, ParallelDES):
+                engine.close()
+
+    report = {'version': 1, 'python': sys.version.split()[0], 'numpy': np is not None, 'results': results}
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"[BASELINE] Disimpan ke {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"[REGRESI] {regression}")
+        if regressions:
+            return 1
+        print(f"[BASELINE] Tidak ada regresi di atas {args.tolerance:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Benchmark pembuatan kunci RSA per ukuran bit.
+
+Contoh pemakaian:
+    python bench_rsa.py                        # 512, 1024, 2048 bit
+    python bench_rsa.py --bits 2048,3072 --rounds 5 --json hasil_rsa.json
+    python bench_rsa.py --bits 2048 --workers 4        # keygen paralel
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from RSA import RSA_Engine
+
+BITS = (512, 1024, 2048)
+
+
+def bench_keygen(bits: int, rounds: int, workers: int = None) -> dict:
+    """Waktu generate_key_pair untuk `rounds` kunci baru berukuran `bits`"""
+    samples = []
+    for _ in range(rounds):
+        engine = RSA_Engine(key_bits=bits, workers=workers)
+        start = time.perf_counter()
+        engine.generate_key_pair()
+        samples.append(time.perf_counter() - start)
+    return {
+        'rounds': rounds,
+        'mean_s': statistics.mean(samples),
+        'p50_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pembuatan kunci RSA")
+    parser.add_argument('--bits', default=','.join(map(str, BITS)), help="ukuran kunci dipisah koma")
+    parser.add_argument('--rounds', type=int, default=3, help="jumlah kunci per ukuran")
+    parser.add_argument('--workers', type=int, help="keygen paralel dengan N worker proses")
+    parser.add_argument('--json', help="menyimpan hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for bits in (int(value) for value in args.bits.split(',')):
+        stats = bench_keygen(bits, args.rounds, args.workers)
+        results[str(bits)] = stats
+        print(f"RSA-{bits:<5} rata-rata {stats['mean_s']:>8.3f} s  p50 {stats['p50_s']:>8.3f} s  "
+              f"min {stats['min_s']:>8.3f} s  max {stats['max_s']:>8.3f} s  ({stats['rounds']} kunci)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'keygen': results}, f, indent=2)
+        print(f"[BENCH] Disimpan ke {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,42 +1,64 @@
+import logging
 import socket
 import sys
 import threading
 from RSA import RSA_Engine 
-from DES import DES 
+from DES import FastDES
+from keystore import KeyStore
+from protocol import (FrameReader, FrameWriter, FRAME_STATUS, FRAME_HELLO, FRAME_SESSION_KEY,
+                      FRAME_DATA, FRAME_BYE)
 import base64
 import os
+import eventlog
 
 # Konfigurasi Jaringan Client
 SERVER_HOST = '127.0.0.1'
 SERVER_PORT = 8000
 
+# Jumlah pasangan kunci siap pakai yang dijaga di key store
+CLIENT_KEY_POOL_SIZE = 4
+
 # Inisialisasi RSA Engine di Client (Gunakan bit kecil untuk performa)
+# Setiap client memakai pasangan kunci baru dari pool; pool diisi ulang di latar belakang
 client_rsa = RSA_Engine(key_bits=256) 
-CLIENT_PUBLIC_KEY_PEM = client_rsa.generate_key_pair() 
+key_store = KeyStore(key_bits=client_rsa.key_bits, pool_size=CLIENT_KEY_POOL_SIZE)
+CLIENT_PUBLIC_KEY_PEM = client_rsa.use_private_key(key_store.take_fresh())
+
+# Nama room opsional (argumen pertama); tanpa nama, server memasangkan otomatis
+ROOM_NAME = sys.argv[1] if len(sys.argv) > 1 else None
+# ID opsional (variabel lingkungan CLIENT_ID): jika koneksi putus, menjalankan client lagi
+# dengan ID yang sama melanjutkan room dan menerima pesan yang tertunda
+CLIENT_ID = os.environ.get('CLIENT_ID')
+
+log = logging.getLogger('client')
+# Satu event per pesan terkirim; di-sampling dan dibatasi lajunya oleh eventlog
+message_log = eventlog.EventLogger('client.message')
 
 SHARED_KEY = None 
-des_engine = DES() 
+des_engine = FastDES()
 
 # --- FUNGSI UTAMA PENERIMAAN PESAN (RECEIVING THREAD) ---
-def receive_messages(client_socket, shared_key_des):
+def receive_messages(client_socket, reader, shared_key_des):
+    # Jadwal subkunci diekspansi sekali untuk seluruh sesi
+    cipher = des_engine.with_key(shared_key_des)
     # Set timeout agar thread dapat keluar jika terjadi masalah
     client_socket.settimeout(0.5) 
-    print("\n[INFO] Thread Penerima aktif. Mendengarkan pesan dari Client lawan...")
+    log.info("[INFO] Thread Penerima aktif. Mendengarkan pesan dari Client lawan...")
     while True:
         try:
-            # Terima data (Ciphertext)
-            ciphertext_response_hex = client_socket.recv(4096).decode('utf-8').strip() 
+            # Terima satu frame (Ciphertext mentah); data parsial tetap di buffer saat timeout
+            frame = reader.read_frame()
             
-            if not ciphertext_response_hex or ciphertext_response_hex.lower() == 'keluar':
-                print("\n[INFO] Client Lawan atau Server memutuskan koneksi. Keluar...")
+            if frame is None or frame.type == FRAME_BYE:
+                log.info("[INFO] Client Lawan atau Server memutuskan koneksi. Keluar...")
                 break
             
-            if len(ciphertext_response_hex) % 16 != 0:
-                print(f"\n[WARN] Data heks diterima tidak valid: {len(ciphertext_response_hex)}. Diabaikan.")
+            if frame.type != FRAME_DATA or len(frame.payload) % 8 != 0:
+                log.warning(f"[WARN] Frame diterima tidak valid (jenis {frame.type}, {len(frame.payload)} byte). Diabaikan.")
                 continue
 
             # Dekripsi data balasan
-            plaintext_response = des_engine.decrypt(ciphertext_response_hex, shared_key_des)
+            plaintext_response = cipher.decrypt_bytes(frame.payload).decode('utf-8')
             
             # Tampilkan pesan ke pengguna
             print("\n" + "=" * 40)
@@ -48,83 +70,91 @@ def receive_messages(client_socket, shared_key_des):
             continue
         except Exception as e:
             # Jika ada error koneksi atau dekripsi
-            print(f"\n[ERROR RECEIVE] Koneksi terputus atau dekripsi gagal: {e}")
+            log.error(f"[ERROR RECEIVE] Koneksi terputus atau dekripsi gagal: {e}")
             break
     
     # Keluar dari thread setelah loop selesai
+    eventlog.shutdown() # os._exit melewati atexit; tulis sisa log dulu
     os._exit(0) # Menghentikan program utama (karena main thread mungkin menunggu input)
 
 
 # --- FUNGSI UTAMA PENGIRIMAN PESAN (MAIN/SENDING THREAD) ---
-def send_messages(client_socket, shared_key_des):
-    print("\n[INFO] Thread Pengirim aktif. Siap mengirim pesan.")
+def send_messages(writer, shared_key_des):
+    cipher = des_engine.with_key(shared_key_des)
+    log.info("[INFO] Thread Pengirim aktif. Siap mengirim pesan.")
     while True:
         try:
             message = input("Anda Kirim (Plaintext, 'KELUAR' untuk keluar): ")
             
             if message.lower() == 'keluar':
-                client_socket.send("keluar".encode('utf-8'))
+                writer.send(FRAME_BYE)
                 break
             
             # Enkripsi dan Kirim data
-            ciphertext_hex = des_engine.encrypt(message, shared_key_des)
-            print(f"[CLIENT ENKRIPSI]: Mengirim {ciphertext_hex}...")
-            client_socket.send(ciphertext_hex.encode('utf-8'))
+            ciphertext = cipher.encrypt_bytes(message.encode('utf-8'))
+            message_log.info("[CLIENT ENKRIPSI]: Mengirim %s...", ciphertext.hex())
+            writer.send(FRAME_DATA, ciphertext)
             
         except Exception as e:
-            print(f"\n[ERROR SEND] Koneksi terputus atau enkripsi gagal: {e}")
+            log.error(f"[ERROR SEND] Koneksi terputus atau enkripsi gagal: {e}")
             break
     
     # Keluar dari thread setelah loop selesai
+    eventlog.shutdown()
     os._exit(0) # Menghentikan program
 
 
 def start_client():
     global SHARED_KEY
+    eventlog.setup()
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     
     try:
-        print(f"[CLIENT] Mencoba terhubung ke {SERVER_HOST}:{SERVER_PORT}...")
+        log.info(f"[CLIENT] Mencoba terhubung ke {SERVER_HOST}:{SERVER_PORT}...")
         client_socket.connect((SERVER_HOST, SERVER_PORT))
-        print("[CLIENT] Berhasil terhubung.")
+        log.info("[CLIENT] Berhasil terhubung.")
         
         # Non-aktifkan timeout setelah connect
         client_socket.settimeout(None)
+        reader = FrameReader(client_socket)
+        writer = FrameWriter(client_socket)
 
         # --- FASE 1: KEY EXCHANGE (Sinkron) ---
         
         # 1a. TUNGGU DAN TERIMA PESAN STATUS KONEKSI AWAL DARI SERVER
-        initial_status = client_socket.recv(4096).decode('utf-8').strip()
+        frame = reader.read_frame()
         
-        if initial_status:
-            print(f"\n[SERVER STATUS]: {initial_status}")
-            print("-" * 40)
+        if frame is not None and frame.type == FRAME_STATUS:
+            log.info(f"[SERVER STATUS]: {frame.payload.decode('utf-8')}")
+            log.info("-" * 40)
 
-        # 1b. KIRIM KUNCI PUBLIK CLIENT KE SERVER
-        client_socket.send(f"CLIENT_PUBLIC_KEY:{CLIENT_PUBLIC_KEY_PEM}".encode('utf-8'))
-        print("[CLIENT RSA] Mengirim Public Key ke Server...")
+        # 1b. KIRIM KUNCI PUBLIK CLIENT (DAN NAMA ROOM) KE SERVER
+        hello = f"CLIENT_PUBLIC_KEY:{CLIENT_PUBLIC_KEY_PEM}"
+        if ROOM_NAME:
+            hello += f"\nROOM:{ROOM_NAME}"
+        if CLIENT_ID:
+            hello += f"\nID:{CLIENT_ID}"
+        writer.send(FRAME_HELLO, hello.encode('utf-8'))
+        log.info(f"[CLIENT RSA] Mengirim Public Key ke Server{f' (room {ROOM_NAME})' if ROOM_NAME else ''}...")
         
         # 2. Terima Kunci DES Terenkripsi dari Server
-        received_data = ""
         while True:
-            # Terima data chunk hingga kunci DES ditemukan
+            # Tunggu frame hingga kunci DES diterima
             # Gunakan timeout agar tidak blocking selamanya jika server gagal mengirim kunci
             client_socket.settimeout(5.0) 
             try:
-                chunk = client_socket.recv(8192).decode('utf-8') 
+                frame = reader.read_frame()
             except socket.timeout:
-                print("[ERROR KRIPTO] Timeout menunggu kunci terenkripsi dari Server.")
+                log.error("[ERROR KRIPTO] Timeout menunggu kunci terenkripsi dari Server.")
                 break
             
-            if not chunk: break
-            received_data += chunk
+            if frame is None or frame.type == FRAME_BYE: break
             
-            if "ENCRYPTED_DES_KEY:" in received_data:
-                parts = received_data.split("ENCRYPTED_DES_KEY:")
-                # Ambil bagian kunci yang di-base64-kan
-                encrypted_key_b64 = parts[1].strip() 
+            if frame.type == FRAME_SESSION_KEY:
+                # Kunci yang di-base64-kan
+                encrypted_key_b64 = frame.payload.decode('utf-8')
                 
-                print("[CLIENT RSA] Menerima Kunci DES Terenkripsi.")
+                log.info("[CLIENT RSA] Menerima Kunci DES Terenkripsi.")
                 
                 # 3. Dekripsi Kunci Sesi DES
                 try:
@@ -135,22 +165,17 @@ def start_client():
                     if len(SHARED_KEY) != 8:
                         raise ValueError(f"Kunci sesi DES yang didekripsi tidak valid ({len(SHARED_KEY)} karakter).")
                          
-                    print(f"[CLIENT KRIPTO] Kunci Sesi DES Berhasil Didekripsi. Kunci Aktif: ********")
-                    print("-" * 40)
+                    log.info(f"[CLIENT KRIPTO] Kunci Sesi DES Berhasil Didekripsi. Kunci Aktif: ********")
+                    log.info("-" * 40)
                     client_socket.settimeout(None) # Hapus timeout setelah berhasil
                     break 
                 except Exception as e:
-                     print(f"[ERROR KRIPTO] Gagal mendekripsi atau memvalidasi kunci: {e}")
+                     log.error(f"[ERROR KRIPTO] Gagal mendekripsi atau memvalidasi kunci: {e}")
                      SHARED_KEY = None 
             
             # Terima pesan status lain jika ada
-            elif "Berhasil terhubung" in received_data:
-                 print(f"\n[SERVER STATUS]: {received_data}")
-                 received_data = ""
-                 
-            if len(received_data) > 8192: 
-                print("[WARN] Buffer terlalu besar, keluar dari loop penerimaan kunci.")
-                break
+            elif frame.type == FRAME_STATUS:
+                 log.info(f"[SERVER STATUS]: {frame.payload.decode('utf-8')}")
 
         if not SHARED_KEY:
             raise Exception("Gagal mendapatkan Kunci Sesi DES dari Server.")
@@ -159,25 +184,26 @@ def start_client():
         
         # Thread untuk menerima pesan 
         receive_thread = threading.Thread(target=receive_messages, 
-                                          args=(client_socket, SHARED_KEY), 
+                                          args=(client_socket, reader, SHARED_KEY), 
                                           daemon=True)
         receive_thread.start()
 
         # Thread utama menangani pengiriman pesan
-        send_messages(client_socket, SHARED_KEY)
+        send_messages(writer, SHARED_KEY)
         
     except ConnectionRefusedError:
-        print(f"\n[ERROR] Koneksi ditolak. Pastikan Server berjalan.")
+        log.error(f"[ERROR] Koneksi ditolak. Pastikan Server berjalan.")
     except Exception as e:
-        print(f"\n[ERROR] Terjadi kesalahan: {e}")
+        log.error(f"[ERROR] Terjadi kesalahan: {e}")
     finally:
         if 'client_socket' in locals():
             try:
                 client_socket.close()
             except:
                 pass
-        print("\n[CLIENT] Koneksi ditutup. Program selesai.")
+        log.info("[CLIENT] Koneksi ditutup. Program selesai.")
         # os._exit(0) # Tidak diperlukan jika send_messages yang mengakhirinya
+        eventlog.shutdown()
         sys.exit(0)
 
 if __name__ == "__main__":
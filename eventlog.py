@@ -0,0 +1,197 @@
+# eventlog.py
+# Logging non-blocking untuk server.py dan client.py.
+#
+# Thread pemanggil hanya membuat LogRecord dan memasukkannya ke antrian (tanpa
+# format, tanpa I/O); thread penulis di latar belakang (QueueListener) yang
+# memformat dan menulis ke konsol. Event dibedakan lewat nama logger (mis.
+# "server.relay"); tiap event dapat di-sampling (1 dari N) dan dibatasi lajunya
+# (event per detik) lewat EventLogger, yang memutuskan sampling sebelum LogRecord
+# dibuat. Semua event terbaru, termasuk yang tidak ditampilkan, disimpan di ring
+# buffer dan dapat di-dump kapan saja (SIGUSR1 atau dump_recent()).
+#
+# Konfigurasi lewat variabel lingkungan:
+#   LOG_LEVEL=INFO
+#   LOG_SAMPLE="server.relay=10"        (tampilkan 1 dari 10 event)
+#   LOG_RATE_LIMIT="server.relay=20"    (paling banyak 20 event per detik)
+import atexit
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+# Kapasitas antrian ke thread penulis; jika penuh, record dibuang (pemanggil tidak pernah menunggu)
+LOG_QUEUE_SIZE = 10000
+# Jumlah event terbaru yang disimpan untuk dump
+RING_BUFFER_SIZE = 2000
+# Batas laju bawaan untuk event per pesan (event per detik) agar konsol tidak membanjir
+DEFAULT_RATE_LIMITS = {'server.relay': 50.0, 'server.backpressure': 5.0, 'client.message': 50.0}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional['NonBlockingQueueHandler'] = None
+_sampler: Optional['EventSampler'] = None
+# Event terbaru: (waktu, level, nama logger, format, argumen); format baru dilakukan saat dump
+_recent = collections.deque(maxlen=RING_BUFFER_SIZE)
+
+
+def _parse_event_map(value: str) -> Dict[str, float]:
+    """"a=1,b=2.5" -> {'a': 1.0, 'b': 2.5}"""
+    result = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, number = item.partition('=')
+        result[name.strip()] = float(number)
+    return result
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler yang tidak memformat di thread pemanggil dan tidak pernah menunggu"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Format dilakukan thread penulis; argumen log di sini hanya nilai sederhana
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class EventSampler:
+    """Sampling 1 dari N dan batas laju (token bucket) per nama event, diputuskan di
+    thread pemanggil sebelum LogRecord dibuat"""
+
+    def __init__(self, sample_rates: Dict[str, float] = None, rate_limits: Dict[str, float] = None):
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limits = dict(rate_limits or {})
+        self._seen = collections.Counter()
+        self._skipped = collections.Counter()
+        self._tokens: Dict[str, float] = {}
+        self._last: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def admit(self, event: str) -> Optional[int]:
+        """None jika event dilewati; selain itu jumlah event serupa yang dilewati sebelumnya"""
+        every = self.sample_rates.get(event, 1)
+        limit = self.rate_limits.get(event)
+        if every <= 1 and not limit:
+            return 0
+        with self._lock:
+            self._seen[event] += 1
+            if every > 1 and (self._seen[event] - 1) % int(every):
+                self._skipped[event] += 1
+                return None
+            if limit:
+                now = time.monotonic()
+                # Token bucket: kapasitas satu detik event
+                tokens = min(limit, self._tokens.get(event, limit) + (now - self._last.get(event, now)) * limit)
+                self._last[event] = now
+                if tokens < 1:
+                    self._tokens[event] = tokens
+                    self._skipped[event] += 1
+                    return None
+                self._tokens[event] = tokens - 1
+            return self._skipped.pop(event, 0)
+
+
+class EventLogger:
+    """Logger untuk event berfrekuensi tinggi (mis. satu per pesan relay).
+
+    Event yang dilewati sampling tidak menjadi LogRecord; event itu hanya dicatat
+    sebagai tuple di ring buffer sehingga tetap muncul saat dump.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.logger = logging.getLogger(name)
+
+    def info(self, msg: str, *args) -> None:
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        skipped = _sampler.admit(self.name) if _sampler is not None else 0
+        if skipped is None:
+            _recent.append((time.time(), 'INFO', self.name, msg, args))
+            return
+        if skipped:
+            msg += " (+%d event serupa tidak ditampilkan)"
+            args += (skipped,)
+        self.logger.info(msg, *args)
+
+
+class RingBufferHandler(logging.Handler):
+    """Menyalin record yang ditulis ke ring buffer event terbaru"""
+
+    def emit(self, record):
+        _recent.append((record.created, record.levelname, record.name, record.msg, record.args))
+
+
+def setup(stream=None, level: str = None, sample_rates: Dict[str, float] = None,
+          rate_limits: Dict[str, float] = None, ring_size: int = RING_BUFFER_SIZE) -> None:
+    """Memasang logging non-blocking pada root logger (sekali per proses)"""
+    global _listener, _queue_handler, _sampler, _recent
+    if _listener is not None:
+        return
+
+    level = level or os.environ.get('LOG_LEVEL', 'INFO')
+    if sample_rates is None:
+        sample_rates = _parse_event_map(os.environ.get('LOG_SAMPLE', ''))
+    if rate_limits is None:
+        rate_limits = dict(DEFAULT_RATE_LIMITS)
+        rate_limits.update(_parse_event_map(os.environ.get('LOG_RATE_LIMIT', '')))
+
+    _sampler = EventSampler(sample_rates, rate_limits)
+    _recent = collections.deque(_recent, maxlen=ring_size)
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(logging.Formatter('%(message)s'))
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(log_queue, RingBufferHandler(), console,
+                                               respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """Menulis sisa antrian lalu menghentikan thread penulis (aman dipanggil berkali-kali)"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    logging.getLogger().removeHandler(_queue_handler)
+    if _queue_handler.dropped:
+        sys.stderr.write(f"[LOG] {_queue_handler.dropped} event dibuang karena antrian log penuh.\n")
+
+
+def dump_recent(stream=None) -> int:
+    """Menulis event terbaru dari ring buffer ke `stream` (default stderr), urut waktu;
+    mengembalikan jumlah event"""
+    stream = stream or sys.stderr
+    events = sorted(list(_recent), key=lambda event: event[0])
+    for created, level, name, msg, args in events:
+        message = msg % args if args else msg
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))
+        stream.write(f"{stamp}.{int(created % 1 * 1000):03d} {level:<7} {name}: {message}\n")
+    stream.flush()
+    return len(events)
+
+
+def install_dump_signal(signum=getattr(signal, 'SIGUSR1', None)) -> bool:
+    """`kill -USR1 <pid>` menulis ring buffer ke stderr (hanya di thread utama, POSIX)"""
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signum, lambda *_: threading.Thread(target=dump_recent, daemon=True).start())
+    return True
@@ -0,0 +1,162 @@
+# keystore.py
+# Penyimpanan pasangan kunci RSA di disk agar server/client tidak perlu
+# membangkitkan bilangan prima setiap kali dijalankan.
+import os
+import struct
+import threading
+import uuid
+from typing import List, Optional
+
+from RSA import RSAPrivateKey, generate_private_key
+
+# Lokasi default, bisa diganti lewat variabel lingkungan KEYSTORE_DIR
+DEFAULT_KEYSTORE_DIR = os.environ.get('KEYSTORE_DIR', os.path.join(os.path.expanduser('~'), '.ki-des3'))
+
+# Format file: magic, versi, jumlah field, lalu tiap field = panjang (2 byte) + integer big-endian
+KEY_MAGIC = b'RSAK'
+KEY_VERSION = 1
+_HEADER = struct.Struct('!4sBB')
+_FIELD_LENGTH = struct.Struct('!H')
+
+
+def encode_private_key(key: RSAPrivateKey) -> bytes:
+    """Serialisasi biner ringkas untuk RSAPrivateKey (semua field, tanpa perlu dihitung ulang)"""
+    parts = [_HEADER.pack(KEY_MAGIC, KEY_VERSION, len(key))]
+    for value in key:
+        raw = value.to_bytes((value.bit_length() + 7) // 8 or 1, 'big')
+        parts.append(_FIELD_LENGTH.pack(len(raw)))
+        parts.append(raw)
+    return b''.join(parts)
+
+
+def decode_private_key(data: bytes) -> RSAPrivateKey:
+    """Kebalikan encode_private_key"""
+    try:
+        magic, version, count = _HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise ValueError("File kunci terlalu pendek.")
+    if magic != KEY_MAGIC or version != KEY_VERSION or count != len(RSAPrivateKey._fields):
+        raise ValueError("Format file kunci tidak dikenali.")
+
+    fields = []
+    offset = _HEADER.size
+    for _ in range(count):
+        if offset + _FIELD_LENGTH.size > len(data):
+            raise ValueError("File kunci terpotong.")
+        (length,) = _FIELD_LENGTH.unpack_from(data, offset)
+        offset += _FIELD_LENGTH.size
+        if offset + length > len(data):
+            raise ValueError("File kunci terpotong.")
+        fields.append(int.from_bytes(data[offset:offset + length], 'big'))
+        offset += length
+    return RSAPrivateKey(*fields)
+
+
+def check_permissions(path: str) -> None:
+    """File kunci privat hanya boleh dapat dibaca pemiliknya (0600)"""
+    if os.name != 'posix':
+        return
+    mode = os.stat(path).st_mode
+    if mode & 0o077:
+        raise PermissionError(f"Izin {path} terlalu longgar ({oct(mode & 0o777)}), harus 0600.")
+
+
+class KeyStore:
+    """Direktori berisi pasangan kunci RSA bernama dan pool kunci siap pakai.
+
+    - load_or_create(name): kunci persisten (mis. milik server), dibuat sekali
+    - take_fresh(): mengambil satu kunci baru dari pool, pool diisi ulang di latar belakang
+    """
+
+    def __init__(self, path: str = DEFAULT_KEYSTORE_DIR, key_bits: int = 256, pool_size: int = 0,
+                 workers: int = None):
+        self.path = path
+        self.key_bits = key_bits
+        self.pool_size = pool_size
+        self.workers = workers
+        self.pool_path = os.path.join(path, 'pool')
+        self._refill_thread = None
+        self._refill_lock = threading.Lock()
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        os.makedirs(self.pool_path, mode=0o700, exist_ok=True)
+
+    def _generate(self) -> RSAPrivateKey:
+        return generate_private_key(self.key_bits, workers=self.workers)
+
+    @staticmethod
+    def _write(path: str, key: RSAPrivateKey) -> None:
+        """Menulis atomik: file sementara 0600 lalu os.replace, tidak pernah setengah jadi"""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encode_private_key(key))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _read(path: str) -> RSAPrivateKey:
+        check_permissions(path)
+        with open(path, 'rb') as f:
+            return decode_private_key(f.read())
+
+    def load(self, name: str) -> Optional[RSAPrivateKey]:
+        """Memuat kunci bernama, None jika belum ada"""
+        path = os.path.join(self.path, f"{name}.key")
+        if not os.path.exists(path):
+            return None
+        return self._read(path)
+
+    def save(self, name: str, key: RSAPrivateKey) -> None:
+        self._write(os.path.join(self.path, f"{name}.key"), key)
+
+    def load_or_create(self, name: str) -> RSAPrivateKey:
+        """Kunci persisten: dimuat dari disk, atau dibuat dan disimpan jika belum ada"""
+        key = self.load(name)
+        if key is None:
+            key = self._generate()
+            self.save(name, key)
+        return key
+
+    def pooled(self) -> List[str]:
+        return sorted(entry for entry in os.listdir(self.pool_path) if entry.endswith('.key'))
+
+    def take_fresh(self) -> RSAPrivateKey:
+        """Mengambil satu kunci dari pool (dibuat langsung jika pool kosong), lalu memicu isi ulang"""
+        try:
+            for entry in self.pooled():
+                path = os.path.join(self.pool_path, entry)
+                claimed = f"{path}.{uuid.uuid4().hex}.claimed"
+                try:
+                    # rename atomik: hanya satu proses yang berhasil mengklaim file ini
+                    os.rename(path, claimed)
+                except FileNotFoundError:
+                    continue
+                try:
+                    return self._read(claimed)
+                finally:
+                    os.remove(claimed)
+            return self._generate()
+        finally:
+            self.start_refill()
+
+    def refill(self) -> int:
+        """Mengisi pool sampai pool_size kunci, mengembalikan jumlah kunci yang dibuat"""
+        created = 0
+        while len(self.pooled()) < self.pool_size:
+            self._write(os.path.join(self.pool_path, f"{uuid.uuid4().hex}.key"), self._generate())
+            created += 1
+        return created
+
+    def start_refill(self) -> Optional[threading.Thread]:
+        """Menjalankan refill() di thread latar belakang (daemon) jika belum berjalan"""
+        if self.pool_size <= 0:
+            return None
+        with self._refill_lock:
+            if self._refill_thread is None or not self._refill_thread.is_alive():
+                self._refill_thread = threading.Thread(target=self.refill, daemon=True)
+                self._refill_thread.start()
+            return self._refill_thread
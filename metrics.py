@@ -0,0 +1,385 @@
+# metrics.py
+# Metrik server (counter, gauge, histogram) dalam format teks Prometheus.
+#
+# Histogram bergaya HDR: nilai (nanodetik) dicatat ke bucket log-linear, yaitu
+# setiap rentang pangkat dua dibagi ke 2^(SUB_BUCKET_BITS-1) bucket sama lebar,
+# sehingga galat relatif tetap kecil (~3%) dari mikrodetik sampai menit dan persentil
+# (p50/p99/p999) dapat dihitung tanpa menyimpan sampel. Saat diekspor, bucket HDR
+# diringkas ke batas `le` tetap (EXPORT_BUCKETS) ditambah gauge persentil.
+#
+# Counter dan histogram dicatat ke sel milik thread pemanggil (tanpa lock); sel
+# dijumlahkan dan teks dibuat saat endpoint dibaca (GET /metrics, HTTP lokal atau
+# Unix socket).
+import http.server
+import logging
+import math
+import os
+import socketserver
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Resolusi histogram: 2^(SUB_BUCKET_BITS-1) bucket per rentang pangkat dua
+SUB_BUCKET_BITS = 6
+# Nilai terbesar yang dibedakan (~18 menit dalam nanodetik); nilai lebih besar masuk bucket terakhir
+HISTOGRAM_MAX_NS = (1 << 40) - 1
+# Batas bucket (detik) pada output Prometheus
+EXPORT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                  0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Persentil yang diekspor sebagai gauge <nama>_quantile
+EXPORT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+# Sel thread yang sudah selesai digabung setiap kali sejumlah ini sel baru dibuat (dan saat dibaca)
+FOLD_EVERY = 256
+
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF_BUCKETS = _SUB_BUCKETS >> 1
+
+log = logging.getLogger('metrics')
+
+
+def _bucket_index(value: int) -> int:
+    """Indeks bucket HDR untuk nilai >= 0"""
+    if value < _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF_BUCKETS + (value >> shift) - _HALF_BUCKETS
+
+
+def _bucket_upper(index: int) -> int:
+    """Nilai terbesar yang masuk bucket `index`"""
+    if index < _SUB_BUCKETS:
+        return index
+    shift, offset = divmod(index - _SUB_BUCKETS, _HALF_BUCKETS)
+    return ((offset + _HALF_BUCKETS + 1) << (shift + 1)) - 1
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _ThreadCells:
+    """Sel per thread: setiap thread hanya menulis selnya sendiri sehingga jalur panas
+    tanpa lock. Sel milik thread yang sudah selesai digabung ke nilai dasar saat dibaca."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells = []  # (thread, sel)
+        self._lock = threading.Lock()
+
+    def _cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._new_cell()
+            with self._lock:
+                self._cells.append((threading.current_thread(), cell))
+                if len(self._cells) % FOLD_EVERY == 0:
+                    self._fold_locked()
+            return cell
+
+    def _fold_locked(self) -> None:
+        alive = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                alive.append((thread, cell))
+            else:
+                self._merge(cell)
+        self._cells = alive
+
+    def _live_cells(self) -> list:
+        with self._lock:
+            self._fold_locked()
+            return [cell for _, cell in self._cells]
+
+
+class _CounterChild(_ThreadCells):
+    def __init__(self):
+        super().__init__()
+        self._base = 0
+
+    def _new_cell(self):
+        return [0]
+
+    def _merge(self, cell) -> None:
+        self._base += cell[0]
+
+    def inc(self, amount: int = 1) -> None:
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            self._cell()[0] += amount
+
+    def value(self):
+        cells = self._live_cells()
+        return self._base + sum(cell[0] for cell in cells)
+
+
+class _GaugeChild:
+    __slots__ = ('_value', '_lock', '_function')
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+        self._function = None
+
+    def set(self, value) -> None:
+        self._value = value
+
+    def inc(self, amount=1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Nilai dihitung saat metrik dibaca (mis. kedalaman antrian)"""
+        self._function = function
+
+    def value(self):
+        return self._function() if self._function is not None else self._value
+
+
+class _HistogramChild(_ThreadCells):
+    def __init__(self):
+        super().__init__()
+        self._counts = [0] * (_bucket_index(HISTOGRAM_MAX_NS) + 1)
+        self._count = 0
+        self._sum = 0
+
+    def _new_cell(self):
+        # {indeks bucket: jumlah}, jumlah nilai, total nilai
+        return [{}, 0, 0]
+
+    def _merge(self, cell) -> None:
+        for index, bucket in cell[0].items():
+            self._counts[index] += bucket
+        self._count += cell[1]
+        self._sum += cell[2]
+
+    def observe_ns(self, value: int) -> None:
+        """Mencatat satu nilai dalam nanodetik (mis. selisih time.perf_counter_ns())"""
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        # _bucket_index ditulis langsung di sini (tanpa panggilan fungsi, tanpa min/max)
+        if value < _SUB_BUCKETS:
+            index = value if value > 0 else 0
+        else:
+            if value > HISTOGRAM_MAX_NS:
+                value = HISTOGRAM_MAX_NS
+            shift = value.bit_length() - SUB_BUCKET_BITS
+            index = _SUB_BUCKETS + (shift - 1) * _HALF_BUCKETS + (value >> shift) - _HALF_BUCKETS
+        counts = cell[0]
+        counts[index] = counts.get(index, 0) + 1
+        cell[1] += 1
+        cell[2] += value
+
+    def observe(self, seconds: float) -> None:
+        self.observe_ns(int(seconds * 1e9))
+
+    def snapshot(self) -> Tuple[List[int], int, int]:
+        with self._lock:
+            self._fold_locked()
+            counts, count, total = list(self._counts), self._count, self._sum
+            cells = [cell for _, cell in self._cells]
+        for cell in cells:
+            for index, bucket in dict(cell[0]).items():
+                counts[index] += bucket
+            count += cell[1]
+            total += cell[2]
+        return counts, count, total
+
+    def percentile(self, quantile: float, snapshot=None) -> float:
+        """Persentil dalam detik (batas atas bucket HDR); 0.0 jika belum ada data"""
+        counts, count, _ = snapshot or self.snapshot()
+        if not count:
+            return 0.0
+        target = max(1, math.ceil(quantile * count))
+        seen = 0
+        for index, bucket in enumerate(counts):
+            seen += bucket
+            if seen >= target:
+                return _bucket_upper(index) / 1e9
+        return HISTOGRAM_MAX_NS / 1e9
+
+
+class _Metric:
+    """Satu family metrik; anak per kombinasi nilai label dibuat saat pertama dipakai"""
+
+    kind = ''
+    child_class = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values: str):
+        """Anak metrik untuk nilai label ini; simpan hasilnya untuk dipakai di jalur panas"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: butuh label {self.labelnames}, diberi {values}.")
+        key = tuple(str(value) for value in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self.child_class()
+            return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in self.children():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value())}"
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    child_class = _CounterChild
+
+    def inc(self, amount: int = 1) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+    child_class = _GaugeChild
+
+    def set(self, value) -> None:
+        self._default.set(value)
+
+    def inc(self, amount=1) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount=1) -> None:
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    """Histogram HDR; nama sebaiknya berakhiran _seconds (nilai diekspor dalam detik)"""
+
+    kind = 'histogram'
+    child_class = _HistogramChild
+
+    def observe_ns(self, value: int) -> None:
+        self._default.observe_ns(value)
+
+    def observe(self, seconds: float) -> None:
+        self._default.observe(seconds)
+
+    def percentile(self, quantile: float) -> float:
+        return self._default.percentile(quantile)
+
+    def render(self) -> Iterable[str]:
+        snapshots = [(values, child, child.snapshot()) for values, child in self.children()]
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for values, _, (counts, count, total) in snapshots:
+            # Bucket HDR diringkas ke batas tetap: bucket masuk `le` jika batas atasnya <= le
+            cumulative = 0
+            index = 0
+            for bound in EXPORT_BUCKETS:
+                while index < len(counts) and _bucket_upper(index) <= bound * 1e9:
+                    cumulative += counts[index]
+                    index += 1
+                labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total / 1e9)}"
+            yield f"{self.name}_count{labels} {count}"
+
+        yield f"# HELP {self.name}_quantile Persentil {self.name} dari histogram HDR"
+        yield f"# TYPE {self.name}_quantile gauge"
+        for values, child, snapshot in snapshots:
+            for quantile in EXPORT_QUANTILES:
+                labels = _format_labels(self.labelnames, values, f'quantile="{quantile}"')
+                yield f"{self.name}_quantile{labels} {_format_value(child.percentile(quantile, snapshot))}"
+
+
+class Registry:
+    """Kumpulan metrik yang dirender bersama"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Metrik {metric.name} sudah terdaftar.")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket tidak punya alamat (client_address berupa string kosong)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        log.debug("[METRICS] %s %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(port: int = None, host: str = '127.0.0.1', unix_socket: str = None, registry: Registry = None):
+    """Menjalankan endpoint metrik di thread daemon (TCP `host:port` atau `unix_socket`);
+    mengembalikan objek server (shutdown() untuk menghentikan)"""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry or REGISTRY})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = _UnixHTTPServer(unix_socket, handler)
+    else:
+        server = http.server.ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
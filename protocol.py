@@ -0,0 +1,262 @@
+# protocol.py
+# Framing biner untuk koneksi client <-> server.
+#
+# Setiap frame = header tetap 9 byte + payload:
+#   type (1 byte) | length payload (4 byte) | sequence (4 byte), big-endian
+# Sequence dihitung per arah per koneksi mulai dari 0, sehingga frame yang
+# hilang atau tertukar langsung terdeteksi. Ciphertext DES dikirim sebagai
+# byte mentah (tanpa heksadesimal).
+import asyncio
+import contextlib
+import socket
+import struct
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+HEADER = struct.Struct('!BII')
+
+# Jenis frame
+FRAME_STATUS = 1       # teks status dari server (UTF-8)
+FRAME_HELLO = 2        # "CLIENT_PUBLIC_KEY:<kunci>[\nROOM:<nama>]" dari client
+FRAME_SESSION_KEY = 3  # kunci sesi DES terbungkus RSA (base64) dari server
+FRAME_DATA = 4         # ciphertext DES mentah
+FRAME_BYE = 5          # sinyal keluar (pengganti "keluar")
+
+FRAME_TYPES = (FRAME_STATUS, FRAME_HELLO, FRAME_SESSION_KEY, FRAME_DATA, FRAME_BYE)
+
+# Batas ukuran payload satu frame, melindungi dari header korup/berbahaya
+MAX_FRAME_SIZE = 16 << 20
+# Ukuran awal buffer FrameReader (membesar otomatis untuk frame yang lebih besar)
+READ_BUFFER_SIZE = 64 * 1024
+
+
+class ProtocolError(Exception):
+    """Frame tidak valid: jenis tidak dikenal, terlalu besar, atau sequence tidak urut"""
+
+
+class Frame(NamedTuple):
+    type: int
+    seq: int
+    payload: bytes
+
+
+def encode_frame(frame_type: int, seq: int, payload: bytes = b'') -> bytes:
+    return HEADER.pack(frame_type, len(payload), seq) + payload
+
+
+def check_header(frame_type: int, length: int, seq: int, expected_seq: int) -> None:
+    if frame_type not in FRAME_TYPES:
+        raise ProtocolError(f"Jenis frame tidak dikenal: {frame_type}")
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame terlalu besar: {length} byte")
+    if seq != expected_seq:
+        raise ProtocolError(f"Sequence frame tidak urut: {seq}, seharusnya {expected_seq}")
+
+
+class FrameWriter:
+    """Mengirim frame ke socket; aman dipakai beberapa thread (sequence tetap urut)"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.seq = 0
+        self._lock = threading.Lock()
+
+    def send(self, frame_type: int, payload: bytes = b'') -> None:
+        """`payload` boleh berupa memoryview; header dan payload dikirim tanpa digabung (sendmsg)"""
+        with self._lock:
+            header = HEADER.pack(frame_type, len(payload), self.seq)
+            if payload and hasattr(self.sock, 'sendmsg'):
+                sent = self.sock.sendmsg([header, payload])
+                if sent < len(header):
+                    self.sock.sendall(header[sent:])
+                    sent = len(header)
+                if sent - len(header) < len(payload):
+                    with memoryview(payload) as view:
+                        self.sock.sendall(view[sent - len(header):])
+            else:
+                self.sock.sendall(header + payload)
+            self.seq = (self.seq + 1) & 0xFFFFFFFF
+
+    @contextlib.contextmanager
+    def frame(self, frame_type: int, length: int):
+        """Mengirim satu frame bertahap: header dikirim di sini, pemanggil menulis tepat
+        `length` byte payload ke socket yang di-yield. Jika gagal di tengah frame koneksi
+        ditutup, karena frame terpotong tidak dapat dipulihkan penerima."""
+        with self._lock:
+            try:
+                self.sock.sendall(HEADER.pack(frame_type, length, self.seq))
+                self.seq = (self.seq + 1) & 0xFFFFFFFF
+                yield self.sock
+            except BaseException:
+                self.abort()
+                raise
+
+    def abort(self) -> None:
+        """Memutus koneksi (mis. setelah frame terkirim sebagian)"""
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class FrameReader:
+    """Parser frame inkremental di atas `recv_into` dengan buffer yang dipakai ulang.
+
+    Data yang diterima ditampung di satu bytearray; beberapa frame dalam satu
+    recv (pipelining) maupun satu frame yang terpecah ke banyak recv ditangani
+    sama. Jika socket memakai timeout, socket.timeout diteruskan ke pemanggil
+    tanpa kehilangan data yang sudah terbaca sebagian.
+    """
+
+    def __init__(self, sock, buffer_size: int = READ_BUFFER_SIZE):
+        self.sock = sock
+        self.expected_seq = 0
+        self._buffer = bytearray(buffer_size)
+        self._start = 0  # awal data yang belum diproses
+        self._end = 0    # akhir data valid di buffer
+
+    def _ensure_space(self, needed: int) -> None:
+        """Memastikan ada ruang untuk frame berukuran `needed` mulai dari _start"""
+        pending = self._end - self._start
+        if self._start and len(self._buffer) - self._start < needed:
+            # Geser sisa data ke depan buffer
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, pending
+        if len(self._buffer) < needed:
+            grown = bytearray(max(needed, 2 * len(self._buffer)))
+            grown[:pending] = self._buffer[self._start:self._end]
+            self._buffer, self._start, self._end = grown, 0, pending
+
+    def _consume(self, count: int) -> None:
+        self._start += count
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def next_frame(self) -> Optional[Frame]:
+        """Frame berikutnya dari data yang sudah ada di buffer, atau None jika belum lengkap"""
+        available = self._end - self._start
+        if available < HEADER.size:
+            return None
+        frame_type, length, seq = HEADER.unpack_from(self._buffer, self._start)
+        check_header(frame_type, length, seq, self.expected_seq)
+        total = HEADER.size + length
+        if available < total:
+            return None
+        payload_start = self._start + HEADER.size
+        payload = bytes(self._buffer[payload_start:payload_start + length])
+        self._consume(total)
+        self.expected_seq = (self.expected_seq + 1) & 0xFFFFFFFF
+        return Frame(frame_type, seq, payload)
+
+    def _fill(self, needed: int) -> int:
+        """Satu recv_into ke ruang kosong buffer, mengembalikan jumlah byte (0 = EOF)"""
+        # Data belum lengkap (pending < needed), jadi setelah ini selalu ada ruang kosong
+        self._ensure_space(needed)
+        with memoryview(self._buffer) as view:
+            received = self.sock.recv_into(view[self._end:])
+        self._end += received
+        return received
+
+    def read_frame(self) -> Optional[Frame]:
+        """Membaca satu frame utuh; None jika koneksi ditutup di batas frame"""
+        while True:
+            frame = self.next_frame()
+            if frame is not None:
+                return frame
+            needed = HEADER.size
+            if self._end - self._start >= HEADER.size:
+                needed += HEADER.unpack_from(self._buffer, self._start)[1]
+            if self._fill(needed) == 0:
+                if self._end != self._start:
+                    raise ProtocolError("Koneksi terputus di tengah frame.")
+                return None
+
+    # --- Pass-through: header dibaca terpisah, payload diteruskan tanpa dibuat objek bytes ---
+
+    def read_header(self) -> Optional[Tuple[int, int, int]]:
+        """Membaca header frame berikutnya saja, mengembalikan (type, length, seq) atau None
+        jika koneksi ditutup. Payload (`length` byte) wajib diambil dengan readinto/skip."""
+        while self._end - self._start < HEADER.size:
+            if self._fill(HEADER.size) == 0:
+                if self._end != self._start:
+                    raise ProtocolError("Koneksi terputus di tengah frame.")
+                return None
+        frame_type, length, seq = HEADER.unpack_from(self._buffer, self._start)
+        check_header(frame_type, length, seq, self.expected_seq)
+        self._consume(HEADER.size)
+        self.expected_seq = (self.expected_seq + 1) & 0xFFFFFFFF
+        return frame_type, length, seq
+
+    def buffered(self) -> int:
+        """Jumlah byte yang sudah diterima tetapi belum diproses"""
+        return self._end - self._start
+
+    def readinto(self, view) -> int:
+        """Mengisi `view` dari data di buffer, atau langsung dari socket jika buffer kosong"""
+        pending = self._end - self._start
+        if pending:
+            count = min(pending, len(view))
+            with memoryview(self._buffer) as source:
+                view[:count] = source[self._start:self._start + count]
+            self._consume(count)
+            return count
+        return self.sock.recv_into(view)
+
+    def readinto_exact(self, view) -> None:
+        """Mengisi `view` sampai penuh"""
+        filled = 0
+        while filled < len(view):
+            received = self.readinto(view[filled:])
+            if received == 0:
+                raise ProtocolError("Koneksi terputus di tengah frame.")
+            filled += received
+
+    def skip(self, length: int) -> None:
+        """Membuang `length` byte payload (frame yang tidak diteruskan)"""
+        while length:
+            if self._end == self._start:
+                with memoryview(self._buffer) as view:
+                    received = self.sock.recv_into(view[:min(length, len(view))])
+                if received == 0:
+                    raise ProtocolError("Koneksi terputus di tengah frame.")
+                length -= received
+                continue
+            count = min(length, self._end - self._start)
+            self._consume(count)
+            length -= count
+
+
+class AsyncFrameWriter:
+    """Versi asyncio FrameWriter; `send` menulis ke StreamWriter tanpa menunggu drain"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.seq = 0
+
+    def send(self, frame_type: int, payload: bytes = b'') -> None:
+        self.stream.write(encode_frame(frame_type, self.seq, payload))
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+
+
+class AsyncFrameReader:
+    """Versi asyncio FrameReader di atas StreamReader (yang sudah mem-buffer sendiri)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.expected_seq = 0
+
+    async def read_frame(self) -> Optional[Frame]:
+        try:
+            header = await self.stream.readexactly(HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise ProtocolError("Koneksi terputus di tengah frame.")
+            return None
+        frame_type, length, seq = HEADER.unpack(header)
+        check_header(frame_type, length, seq, self.expected_seq)
+        try:
+            payload = await self.stream.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise ProtocolError("Koneksi terputus di tengah frame.")
+        self.expected_seq = (self.expected_seq + 1) & 0xFFFFFFFF
+        return Frame(frame_type, seq, payload)
@@ -0,0 +1,319 @@
+# relay.py
+# Jalur relay untuk server.py: payload frame DATA diteruskan apa adanya ke
+# penerima tanpa pernah didekode.
+#
+# Setiap penerima punya OutboundQueue terbatas yang dikosongkan thread-nya sendiri,
+# sehingga penerima lambat tidak menahan thread relay pengirim; pengirim hanya
+# ditahan (backpressure) saat antrian penerima melewati high watermark. Payload
+# besar ke satu penerima yang antriannya kosong dipindahkan dengan os.splice lewat
+# pipe (Linux) sehingga tidak melewati Python.
+import collections
+import contextlib
+import os
+import sys
+import threading
+import time
+from typing import Callable, List, Tuple
+
+from protocol import FRAME_DATA, HEADER, ProtocolError
+
+# Ukuran dan jumlah buffer yang dialokasikan di awal
+RELAY_BUFFER_SIZE = 64 * 1024
+RELAY_POOL_SIZE = 16
+# Byte maksimum per panggilan splice (kapasitas default pipe Linux)
+SPLICE_CHUNK_SIZE = 64 * 1024
+# os.splice hanya ada di Linux (Python 3.10+); bisa dimatikan dengan RELAY_SPLICE=0
+SPLICE_AVAILABLE = sys.platform.startswith('linux') and hasattr(os, 'splice')
+USE_SPLICE = SPLICE_AVAILABLE and os.environ.get('RELAY_SPLICE', '1') != '0'
+
+# Batas antrian keluar per penerima (byte, termasuk header frame), bisa diganti lewat
+# variabel lingkungan. Di atas high watermark pengirim ditahan sampai antrian turun
+# ke low watermark; di atas QUEUE_MAX_BYTES frame baru ditolak.
+QUEUE_HIGH_WATERMARK = int(os.environ.get('QUEUE_HIGH_WATERMARK', 1 << 20))
+QUEUE_LOW_WATERMARK = int(os.environ.get('QUEUE_LOW_WATERMARK', 256 * 1024))
+QUEUE_MAX_BYTES = int(os.environ.get('QUEUE_MAX_BYTES', 16 << 20))
+
+
+class BufferPool:
+    """Pool bytearray berukuran tetap, dialokasikan di awal dan dipakai ulang antar thread"""
+
+    def __init__(self, buffer_size: int = RELAY_BUFFER_SIZE, count: int = RELAY_POOL_SIZE):
+        self.buffer_size = buffer_size
+        self.count = count
+        self._free = [bytearray(buffer_size) for _ in range(count)]
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bytearray:
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        # Pool habis (banyak relay bersamaan): buffer sementara
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer: bytearray) -> None:
+        with self._lock:
+            if len(self._free) < self.count:
+                self._free.append(buffer)
+
+    @contextlib.contextmanager
+    def buffer(self):
+        buffer = self.acquire()
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+
+class OutboundQueue:
+    """Antrian frame keluar yang terbatas untuk satu penerima.
+
+    Memiliki antarmuka `send` yang sama dengan FrameWriter sehingga dapat dipasang
+    sebagai rooms.Member.writer. Selama tidak ada writer (penerima offline) frame
+    tetap ditampung sampai QUEUE_MAX_BYTES dan dikirim setelah attach().
+
+    `on_sent(frame_type, size, queued_ns)` dipanggil setelah setiap frame terkirim ke
+    socket; `queued_ns` adalah time.perf_counter_ns() saat frame masuk antrian.
+    """
+
+    def __init__(self, writer=None, high_watermark: int = QUEUE_HIGH_WATERMARK,
+                 low_watermark: int = QUEUE_LOW_WATERMARK, max_bytes: int = QUEUE_MAX_BYTES,
+                 on_sent: Callable[[int, int, int], None] = None):
+        if not 0 <= low_watermark <= high_watermark <= max_bytes:
+            raise ValueError("Harus 0 <= low_watermark <= high_watermark <= max_bytes.")
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.max_bytes = max_bytes
+        self._writer = writer
+        self._items = collections.deque()
+        self._bytes = 0
+        self._paused = False
+        self._closed = False
+        self._cond = threading.Condition()
+        # Hanya satu frame di socket pada satu waktu (thread pengosong atau direct())
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self.on_sent = on_sent
+        self.peak_bytes = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def start(self, name: str = None) -> threading.Thread:
+        """Menjalankan thread pengosong antrian (daemon)"""
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    @property
+    def paused(self) -> bool:
+        """True sejak antrian melewati high watermark sampai turun ke low watermark"""
+        return self._paused
+
+    def send(self, frame_type: int, payload: bytes = b'') -> bool:
+        """Memasukkan frame ke antrian tanpa menunggu; False jika antrian penuh/ditutup"""
+        size = HEADER.size + len(payload)
+        with self._cond:
+            if self._closed:
+                return False
+            # Antrian kosong selalu menerima satu frame, sebesar apa pun
+            if self._items and self._bytes + size > self.max_bytes:
+                self.dropped += 1
+                return False
+            self._items.append((frame_type, payload, time.perf_counter_ns()))
+            self._bytes += size
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            if self._bytes >= self.high_watermark:
+                self._paused = True
+            self._cond.notify_all()
+        return True
+
+    def wait_writable(self, timeout: float = None) -> bool:
+        """Backpressure untuk pengirim: jika antrian melewati high watermark, tunggu sampai
+        turun ke low watermark. Tidak menunggu untuk penerima offline. False jika timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._paused or self._writer is None or self._closed, timeout)
+
+    def attach(self, writer) -> None:
+        """Memasang writer (koneksi baru); frame yang tertunda langsung dikirim"""
+        with self._cond:
+            self._writer = writer
+            self._cond.notify_all()
+
+    def detach(self) -> None:
+        """Penerima offline: frame berikutnya ditampung tanpa dikirim"""
+        with self._cond:
+            self._writer = None
+            self._cond.notify_all()
+
+    def take_all(self) -> List[Tuple[int, bytes]]:
+        """Mengambil semua frame yang tertunda (dipakai mode asyncio saat client kembali)"""
+        with self._cond:
+            items = [(frame_type, payload) for frame_type, payload, _ in self._items]
+            self._items.clear()
+            self._bytes = 0
+            self._paused = False
+            self._cond.notify_all()
+            return items
+
+    def close(self) -> None:
+        """Membuang frame tertunda dan menghentikan thread pengosong"""
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'frames': len(self._items),
+                'bytes': self._bytes,
+                'peak_bytes': self.peak_bytes,
+                'sent': self.sent,
+                'dropped': self.dropped,
+                'online': self._writer is not None,
+            }
+
+    @contextlib.contextmanager
+    def direct(self):
+        """Menulis langsung ke socket (mis. splice) tanpa melewati antrian. Yield writer
+        jika antrian kosong dan penerima online, selain itu None (frame harus diantrekan)."""
+        with self._send_lock:
+            with self._cond:
+                writer = self._writer if not self._items and not self._closed else None
+            yield writer
+
+    def sent_directly(self, frame_type: int, size: int, started_ns: int) -> None:
+        """Mencatat frame yang ditulis lewat direct() (dihitung seperti frame dari antrian)"""
+        with self._cond:
+            self.sent += 1
+        if self.on_sent is not None:
+            self.on_sent(frame_type, size, started_ns)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or (self._items and self._writer is not None))
+                if self._closed:
+                    return
+                writer = self._writer
+            with self._send_lock:
+                with self._cond:
+                    if self._closed or not self._items or self._writer is not writer:
+                        continue
+                    item = self._items[0]
+                frame_type, payload, queued_ns = item
+                try:
+                    writer.send(frame_type, payload)
+                except OSError:
+                    # Koneksi penerima putus: frame tetap di antrian untuk koneksi berikutnya
+                    with self._cond:
+                        if self._writer is writer:
+                            self._writer = None
+                    continue
+                with self._cond:
+                    # Frame terdepan hanya dihapus setelah terkirim utuh (urutan tetap terjaga)
+                    if self._items and self._items[0] is item:
+                        self._items.popleft()
+                        self._bytes -= HEADER.size + len(payload)
+                        self.sent += 1
+                    if self._paused and self._bytes <= self.low_watermark:
+                        self._paused = False
+                    self._cond.notify_all()
+                if self.on_sent is not None:
+                    self.on_sent(frame_type, len(payload), queued_ns)
+
+
+class _ReceiverFailed(Exception):
+    """Penerima gagal di tengah splice; `remaining` byte payload belum diambil dari pengirim"""
+
+    def __init__(self, remaining: int, error: OSError):
+        super().__init__(error)
+        self.remaining = remaining
+        self.error = error
+
+
+class PayloadForwarder:
+    """Meneruskan payload frame DATA dari satu pengirim; satu objek per thread relay
+    (pipe splice milik objek ini, buffer dipinjam dari pool bersama)."""
+
+    def __init__(self, pool: BufferPool, use_splice: bool = USE_SPLICE):
+        self.pool = pool
+        self.use_splice = use_splice
+        self._pipe = None
+
+    def close(self) -> None:
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
+
+    def forward(self, reader, length: int, receivers) -> List[Tuple[object, str]]:
+        """Meneruskan `length` byte payload dari `reader` ke `receivers` (rooms.Member yang
+        writer-nya OutboundQueue).
+
+        Mengembalikan pasangan (penerima, alasan) untuk penerima yang tidak menerima frame;
+        error di sisi pengirim (ProtocolError/OSError) diteruskan ke pemanggil.
+        """
+        if len(receivers) == 1 and self.use_splice and length > self.pool.buffer_size:
+            queue = receivers[0].writer
+            with queue.direct() as writer:
+                if writer is not None:
+                    started = time.perf_counter_ns()
+                    failed = self._forward_spliced(reader, length, receivers[0], writer)
+                    if not failed:
+                        queue.sent_directly(FRAME_DATA, length, started)
+                    return failed
+
+        # Payload dibaca sekali ke buffer miliknya sendiri, lalu dibagi ke semua antrian
+        payload = bytearray(length)
+        with memoryview(payload) as view:
+            reader.readinto_exact(view)
+        failed = []
+        for receiver in receivers:
+            if not receiver.send(FRAME_DATA, payload):
+                failed.append((receiver, "antrian penuh"))
+        return failed
+
+    def _forward_spliced(self, reader, length, receiver, writer):
+        """Payload besar ke satu penerima yang antriannya kosong: sisa di buffer reader
+        dikirim dulu, selebihnya dipindahkan socket -> pipe -> socket oleh kernel (zero-copy)"""
+        try:
+            with contextlib.ExitStack() as stack:
+                try:
+                    sock = stack.enter_context(writer.frame(FRAME_DATA, length))
+                except OSError as e:
+                    raise _ReceiverFailed(length, e)
+                head = min(length, reader.buffered())
+                if head:
+                    with self.pool.buffer() as buffer, memoryview(buffer) as view:
+                        reader.readinto_exact(view[:head])
+                        try:
+                            sock.sendall(view[:head])
+                        except OSError as e:
+                            raise _ReceiverFailed(length - head, e)
+                self._splice(reader.sock.fileno(), sock.fileno(), length - head)
+        except _ReceiverFailed as e:
+            # Sisa payload tetap harus diambil agar stream pengirim tetap sinkron
+            reader.skip(e.remaining)
+            return [(receiver, str(e.error))]
+        return []
+
+    def _splice(self, src_fd: int, dst_fd: int, length: int) -> None:
+        if self._pipe is None:
+            self._pipe = os.pipe()
+        pipe_read, pipe_write = self._pipe
+        remaining = length
+        while remaining:
+            moved = os.splice(src_fd, pipe_write, min(remaining, SPLICE_CHUNK_SIZE))
+            if moved == 0:
+                raise ProtocolError("Koneksi terputus di tengah frame.")
+            remaining -= moved
+            try:
+                while moved:
+                    moved -= os.splice(pipe_read, dst_fd, moved)
+            except OSError as e:
+                # Kosongkan pipe agar bisa dipakai untuk frame berikutnya
+                while moved:
+                    moved -= len(os.read(pipe_read, moved))
+                raise _ReceiverFailed(remaining, e)
@@ -0,0 +1,200 @@
+# rooms.py
+# Registry room untuk server relay: setiap room punya anggota, kunci sesi DES
+# sendiri, dan relay sendiri. Client bergabung ke room bernama, atau dipasangkan
+# otomatis ke room "auto-N" berisi dua orang.
+#
+# Client yang mengirim ID dapat terputus sebentar: ia ditandai offline (tetap
+# anggota room, pesan untuknya diantrekan) dan dapat melanjutkan dengan ID yang sama.
+import itertools
+import threading
+from typing import Dict, List, Optional
+
+# Prefiks nama room hasil pemasangan otomatis
+AUTO_ROOM_PREFIX = 'auto-'
+# Jumlah anggota room otomatis (sepasang client)
+AUTO_ROOM_SIZE = 2
+# Jumlah anggota minimal sebelum kunci sesi dibagikan dan relay aktif
+MIN_ACTIVE_MEMBERS = 2
+
+
+class Member:
+    """Satu client di room; `writer` adalah FrameWriter, AsyncFrameWriter, atau OutboundQueue.
+
+    `key` identitas di dalam room: ID dari client (bisa dipakai kembali setelah
+    terputus) atau label koneksi jika client tidak mengirim ID.
+    """
+
+    __slots__ = ('label', 'writer', 'pubkey', 'key', 'room', 'online')
+
+    def __init__(self, label: str, writer, pubkey: str, key: Optional[str] = None):
+        self.label = label
+        self.writer = writer
+        self.pubkey = pubkey
+        self.key = key or label
+        self.room = None
+        self.online = True
+
+    def send(self, frame_type: int, payload: bytes = b''):
+        return self.writer.send(frame_type, payload)
+
+
+class Room:
+    """Sekumpulan anggota yang saling di-relay dengan satu kunci sesi"""
+
+    def __init__(self, name: str, capacity: Optional[int] = None):
+        self.name = name
+        self.capacity = capacity
+        self.members: Dict[str, Member] = {}
+        self.session_key = None
+        self.active = False
+        self.lock = threading.Lock()
+
+    def is_full(self) -> bool:
+        return self.capacity is not None and len(self.members) >= self.capacity
+
+    def others(self, member: Member) -> List[Member]:
+        """Anggota lain (snapshot), biaya sebanding jumlah anggota room, bukan jumlah room"""
+        with self.lock:
+            return [other for other in self.members.values() if other is not member]
+
+
+class RoomRegistry:
+    """Pemetaan nama room -> Room dengan lookup O(1).
+
+    `key_factory` membuat kunci sesi baru setiap kali sebuah room menjadi aktif.
+    """
+
+    def __init__(self, key_factory, auto_room_size: int = AUTO_ROOM_SIZE, min_active: int = MIN_ACTIVE_MEMBERS):
+        self.key_factory = key_factory
+        self.auto_room_size = auto_room_size
+        self.min_active = min_active
+        self._rooms: Dict[str, Room] = {}
+        self._offline: Dict[str, Member] = {}
+        self._open_auto_room: Optional[Room] = None
+        self._auto_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[Room]:
+        return self._rooms.get(name)
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def members(self) -> List[Member]:
+        """Snapshot semua anggota di semua room (termasuk yang offline)"""
+        with self._lock:
+            rooms = list(self._rooms.values())
+        members = []
+        for room in rooms:
+            with room.lock:
+                members.extend(room.members.values())
+        return members
+
+    def join(self, member: Member, name: Optional[str] = None) -> List[Member]:
+        """Memasukkan `member` ke room bernama (atau room otomatis jika name kosong).
+
+        Mengembalikan anggota yang perlu menerima kunci sesi sekarang: semua
+        anggota saat room baru aktif, hanya `member` jika room sudah aktif,
+        atau list kosong jika room masih menunggu anggota lain.
+        """
+        with self._lock:
+            if name:
+                room = self._rooms.get(name)
+                if room is None:
+                    room = self._rooms[name] = Room(name)
+                elif name.startswith(AUTO_ROOM_PREFIX) and room.is_full():
+                    raise ValueError(f"Room {name} sudah penuh.")
+            else:
+                room = self._open_auto_room
+                if room is None:
+                    room = Room(f"{AUTO_ROOM_PREFIX}{next(self._auto_ids)}", self.auto_room_size)
+                    self._rooms[room.name] = room
+                    self._open_auto_room = room
+
+            with room.lock:
+                if member.key in room.members:
+                    raise ValueError(f"ID {member.key} sudah dipakai di room {room.name}.")
+                room.members[member.key] = member
+                member.room = room
+                if room is self._open_auto_room and room.is_full():
+                    self._open_auto_room = None
+
+                if room.active:
+                    return [member]
+                if len(room.members) >= self.min_active:
+                    room.active = True
+                    room.session_key = self.key_factory()
+                    return list(room.members.values())
+                return []
+
+    def leave(self, member: Member) -> List[Member]:
+        """Mengeluarkan `member` dari room-nya.
+
+        Jika anggota tersisa kurang dari minimum, room dibubarkan dan anggota
+        yang tersisa dikembalikan (agar diberi sinyal keluar).
+        """
+        with self._lock:
+            return self._leave_locked(member)
+
+    def _leave_locked(self, member: Member) -> List[Member]:
+        room = member.room
+        if self._offline.get(member.key) is member:
+            del self._offline[member.key]
+        if room is None:
+            return []
+        with room.lock:
+            if room.members.get(member.key) is member:
+                del room.members[member.key]
+            member.room = None
+            if room.active and len(room.members) < self.min_active:
+                remaining = list(room.members.values())
+                room.members.clear()
+            elif not room.members:
+                remaining = []
+            else:
+                return []
+            for other in remaining:
+                other.room = None
+                if self._offline.get(other.key) is other:
+                    del self._offline[other.key]
+        if self._rooms.get(room.name) is room:
+            del self._rooms[room.name]
+        if self._open_auto_room is room:
+            self._open_auto_room = None
+        return remaining
+
+    def mark_offline(self, member: Member) -> None:
+        """Koneksi `member` putus tanpa pamit: tetap anggota room, menunggu tersambung kembali"""
+        with self._lock:
+            if member.room is not None:
+                member.online = False
+                self._offline[member.key] = member
+
+    def take_offline(self, key: str) -> Optional[Member]:
+        """Mengklaim anggota offline ber-ID `key` untuk dilanjutkan koneksi baru"""
+        with self._lock:
+            member = self._offline.pop(key, None)
+            if member is not None and member.room is None:
+                return None
+            return member
+
+    def replace(self, previous: Member, member: Member) -> Optional[Room]:
+        """Menempatkan `member` (koneksi baru) di posisi `previous` yang diklaim take_offline.
+        None jika room sudah bubar sementara itu."""
+        with self._lock:
+            room = previous.room
+            if room is None:
+                return None
+            with room.lock:
+                room.members[member.key] = member
+                member.room = room
+                previous.room = None
+            return room
+
+    def expire(self, member: Member) -> Optional[List[Member]]:
+        """Batas waktu offline habis: `member` dikeluarkan seperti leave(). None jika
+        anggota sudah tersambung kembali atau sudah keluar."""
+        with self._lock:
+            if self._offline.get(member.key) is not member:
+                return None
+            return self._leave_locked(member)
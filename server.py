@@ -1,233 +1,408 @@
+import logging
 import socket
 import threading
 import sys
-import time
 import os
 import random
 import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+import eventlog
+import metrics
 from DES import DES 
-from RSA import RSA_Engine
+from RSA import RSA_Engine, WRAP_BATCH_SIZE
+from keystore import KeyStore
+from protocol import (FrameReader, FrameWriter, ProtocolError, FRAME_STATUS, FRAME_HELLO,
+                      FRAME_SESSION_KEY, FRAME_DATA, FRAME_BYE)
+from relay import BufferPool, OutboundQueue, PayloadForwarder
+from rooms import Member, RoomRegistry
 
 # Konfigurasi Jaringan Server
 HOST = '127.0.0.1'
 PORT = 8000
 
+# Logger per jenis event: "server.relay" (per pesan) dan "server.backpressure" dapat
+# di-sampling/dibatasi lajunya tanpa menyembunyikan event koneksi (lihat eventlog.py)
+log = logging.getLogger('server')
+relay_log = eventlog.EventLogger('server.relay')
+backpressure_log = eventlog.EventLogger('server.backpressure')
+
 # Inisialisasi RSA Engine di Server
+# Pasangan kunci dimuat dari key store (hanya dibangkitkan sekali saat belum ada)
 server_rsa = RSA_Engine()
-SERVER_PUBLIC_KEY = server_rsa.generate_key_pair() 
+key_store = KeyStore(key_bits=server_rsa.key_bits)
+SERVER_PUBLIC_KEY = server_rsa.use_private_key(key_store.load_or_create('server'))
+
+# Batas koneksi yang menunggu accept
+BACKLOG = 128
 
-# Kunci DES yang akan digunakan bersama (Dibuat secara acak)
-SESSION_DES_KEY = None
+# Client ber-ID yang terputus tanpa pamit tetap menjadi anggota room selama ini (detik);
+# pesan untuknya diantrekan dan dikirim saat ia tersambung kembali dengan ID yang sama
+OFFLINE_GRACE = 30.0
+# Lama maksimum pengirim ditahan menunggu antrian penerima turun ke low watermark (detik)
+BACKPRESSURE_TIMEOUT = 10.0
 
-# Variabel global untuk menyimpan soket DAN KUNCI PUBLIK kedua client
-client_a_socket = None
-client_b_socket = None
-client_a_pubkey = None # Kunci Publik Client A
-client_b_pubkey = None # Kunci Publik Client B
-lock = threading.Lock()
+# Endpoint metrik Prometheus (GET /metrics) di HOST:METRICS_PORT; METRICS_PORT=0 mematikannya.
+# Jika METRICS_SOCKET diisi, endpoint memakai Unix socket di path tersebut.
+METRICS_PORT = int(os.environ.get('METRICS_PORT', 8001))
+METRICS_SOCKET = os.environ.get('METRICS_SOCKET')
+
+# Pool proses untuk membungkus kunci sesi ke banyak penerima (dibuat saat pertama dibutuhkan)
+KEY_WRAP_WORKERS = os.cpu_count() or 1
+key_wrap_executor = None
 
 # Fungsi untuk menghasilkan kunci DES acak 8 karakter
 def generate_des_key():
     chars = string.ascii_letters + string.digits
     return ''.join(random.choice(chars) for _ in range(8))
 
-# Fungsi untuk menerima kunci publik dari Client
-def receive_client_pubkey(conn, client_label):
-    global client_a_pubkey, client_b_pubkey
-    
-    data = ""
-    # Data dari recv pertama (status awal) kemungkinan sudah diterima di start_server.
-    # Kita hanya perlu menerima data selanjutnya yang berisi kunci publik.
-    # Perbaiki: Cukup terima 1 kali yang berisi kunci publik, anggap client mengirim segera.
+# Registry room: setiap room punya kunci sesi DES sendiri (dibuat saat room aktif)
+rooms = RoomRegistry(key_factory=generate_des_key)
+
+# Buffer relay yang dialokasikan sekali dan dipakai bersama semua thread relay
+relay_pool = BufferPool()
+
+# --- Metrik (lihat metrics.py); anak berlabel disimpan agar jalur relay tidak mencari label ---
+connections_accepted = metrics.Counter('server_connections_accepted_total', "Koneksi yang diterima")
+connections_active = metrics.Gauge('server_connections_active', "Koneksi yang sedang dilayani")
+handshake_seconds = metrics.Histogram(
+    'server_handshake_seconds', "Durasi handshake: menunggu Public Key sampai kunci sesi terkirim")
+key_exchange_seconds = metrics.Histogram(
+    'server_key_exchange_seconds', "Durasi send_encrypted_keys (bungkus RSA dan kirim)")
+relay_messages = metrics.Counter('server_relay_messages_total', "Frame DATA yang di-relay", ['direction'])
+relay_bytes = metrics.Counter('server_relay_bytes_total', "Byte payload DATA yang di-relay", ['direction'])
+relay_latency_seconds = metrics.Histogram(
+    'server_relay_latency_seconds', "Payload selesai diterima dari pengirim sampai terkirim ke penerima")
+errors = metrics.Counter('server_errors_total', "Error per jenis", ['kind'])
+queue_bytes = metrics.Gauge('server_queue_bytes', "Byte tertunda di antrian keluar semua anggota")
+queue_frames = metrics.Gauge('server_queue_frames', "Frame tertunda di antrian keluar semua anggota")
+queue_max_bytes = metrics.Gauge('server_queue_max_bytes', "Antrian keluar terbesar (byte)")
+queue_dropped = metrics.Gauge('server_queue_dropped_frames', "Frame ditolak karena antrian penuh (anggota saat ini)")
+room_members = metrics.Gauge('server_members', "Anggota room", ['state'])
+messages_in, messages_out = relay_messages.labels('in'), relay_messages.labels('out')
+bytes_in, bytes_out = relay_bytes.labels('in'), relay_bytes.labels('out')
+relay_latency = relay_latency_seconds.labels()
+
+def parse_client_hello(data):
+    """Memisahkan Public Key, nama room opsional, dan ID client opsional dari pesan
+    "CLIENT_PUBLIC_KEY:<kunci>[\nROOM:<nama>][\nID:<id>]"; (None, None, None) jika tidak valid"""
+    if "CLIENT_PUBLIC_KEY:" not in data:
+        return None, None, None
+    pubkey_pem, room_name, client_id = None, None, None
+    for line in data[data.find("CLIENT_PUBLIC_KEY:"):].splitlines():
+        if line.startswith("CLIENT_PUBLIC_KEY:"):
+            pubkey_pem = line[len("CLIENT_PUBLIC_KEY:"):].strip()
+        elif line.startswith("ROOM:"):
+            room_name = line[len("ROOM:"):].strip() or None
+        elif line.startswith("ID:"):
+            client_id = line[len("ID:"):].strip() or None
+    return pubkey_pem, room_name, client_id
+
+# Fungsi untuk menerima kunci publik (dan nama room) dari Client
+def receive_client_pubkey(conn, reader, client_label):
+    """Mengembalikan (pubkey, nama room, ID) dari frame HELLO atau (None, None, None) jika gagal"""
     try:
         conn.settimeout(3.0) # Beri batas waktu untuk menunggu kunci publik
-        chunk = conn.recv(4096).decode('utf-8')
-        data += chunk
+        frame = reader.read_frame()
         conn.settimeout(None) # Hapus batas waktu
-        
-        if "CLIENT_PUBLIC_KEY:" in data:
-            pubkey_pem = data[data.find("CLIENT_PUBLIC_KEY:") + len("CLIENT_PUBLIC_KEY:"):].strip()
-            
-            with lock:
-                if client_label == 'Client A':
-                    client_a_pubkey = pubkey_pem
-                else:
-                    client_b_pubkey = pubkey_pem
-            
-            print(f"[SERVER KEY] {client_label} Public Key diterima.")
-            return True
+
+        if frame is None or frame.type != FRAME_HELLO:
+            log.warning(f"[SERVER WARN] Frame HELLO tidak diterima dari {client_label}.")
+            return None, None, None
+        pubkey_pem, room_name, client_id = parse_client_hello(frame.payload.decode('utf-8'))
+        if pubkey_pem:
+            log.info(f"[SERVER KEY] {client_label} Public Key diterima.")
         else:
-            print(f"[SERVER WARN] Data kunci publik tidak valid dari {client_label}.")
-            return False
+            log.warning(f"[SERVER WARN] Data kunci publik tidak valid dari {client_label}.")
+        return pubkey_pem, room_name, client_id
             
     except socket.timeout:
-        print(f"[SERVER WARN] Timeout menunggu Public Key dari {client_label}.")
-        return False
+        log.warning(f"[SERVER WARN] Timeout menunggu Public Key dari {client_label}.")
+        return None, None, None
     except Exception as e:
-        print(f"[SERVER ERROR] Gagal menerima Public Key: {e}")
-        return False
+        log.error(f"[SERVER ERROR] Gagal menerima Public Key: {e}")
+        return None, None, None
 
-# Fungsi baru untuk mengirim Kunci DES terenkripsi ke Client
-def send_encrypted_key(client_conn, client_pubkey_pem):
-    global SESSION_DES_KEY
-    if not SESSION_DES_KEY:
-        SESSION_DES_KEY = generate_des_key()
-        print(f"[SERVER] Kunci Sesi DES Dibuat: {SESSION_DES_KEY}")
+def get_key_wrap_executor():
+    global key_wrap_executor
+    if key_wrap_executor is None:
+        key_wrap_executor = ProcessPoolExecutor(max_workers=KEY_WRAP_WORKERS)
+    return key_wrap_executor
 
-    try:
-        encrypted_key = server_rsa.encrypt_with_public_key(
-            SESSION_DES_KEY.encode('utf-8'), 
-            client_pubkey_pem 
-        )
-        
-        client_conn.send(f"ENCRYPTED_DES_KEY:{encrypted_key}".encode('utf-8'))
-        print(f"[SERVER KEY] Kunci DES terenkripsi dikirim ke Client.")
-        return True
-    except Exception as e:
-        print(f"[SERVER ERROR] Gagal mengenkripsi/mengirim kunci: {e}")
-        return False
+# Fungsi untuk mengirim Kunci DES terenkripsi ke sekumpulan anggota room
+def send_encrypted_keys(session_key, recipients):
+    """recipients: list Member; kunci sesi dibungkus sekaligus untuk semua penerima"""
+    started = time.perf_counter_ns()
+    # Pool proses hanya dipakai jika penerima lebih dari satu batch
+    executor = get_key_wrap_executor() if len(recipients) > WRAP_BATCH_SIZE else None
+    wrapped = server_rsa.wrap_key_for_recipients(
+        session_key.encode('utf-8'),
+        {member.label: member.pubkey for member in recipients},
+        executor=executor
+    )
 
-# Fungsi untuk mengirim pesan dari satu client ke client lain
-def relay_message(sender_conn, receiver_conn_ref, sender_label, receiver_label):
-    while True:
+    all_sent = True
+    for member in recipients:
+        label = member.label
+        encrypted_key = wrapped[label]
+        if isinstance(encrypted_key, Exception):
+            log.error(f"[SERVER ERROR] Gagal mengenkripsi kunci untuk {label}: {encrypted_key}")
+            errors.labels('key_exchange').inc()
+            all_sent = False
+            continue
         try:
-            # Ambil socket lawan secara thread-safe
-            with lock:
-                receiver_conn = receiver_conn_ref()
+            member.send(FRAME_SESSION_KEY, encrypted_key.encode('utf-8'))
+            log.info(f"[SERVER KEY] Kunci DES terenkripsi dikirim ke {label}.")
+        except Exception as e:
+            log.error(f"[SERVER ERROR] Gagal mengirim kunci ke {label}: {e}")
+            errors.labels('key_exchange').inc()
+            all_sent = False
+    key_exchange_seconds.observe_ns(time.perf_counter_ns() - started)
+    return all_sent
 
-            # Terima data dari pengirim (Ciphertext dari Client)
-            ciphertext_hex = sender_conn.recv(4096).decode('utf-8').strip()
+# Fungsi untuk me-relay pesan dari satu anggota ke anggota lain di room yang sama
+def relay_message(conn, reader, member):
+    sender_label = member.label
+    # Ciphertext tidak pernah didekode: hanya header yang dibaca, payload diteruskan apa adanya
+    forwarder = PayloadForwarder(relay_pool)
+    said_bye = False
+    while True:
+        try:
+            # Terima header frame dari pengirim
+            header = reader.read_header()
 
-            if not ciphertext_hex or ciphertext_hex.lower() == 'keluar':
-                print(f"[SERVER] {sender_label} meminta keluar. Memberi sinyal keluar ke {receiver_label}.")
-                if receiver_conn:
-                    receiver_conn.send("keluar".encode('utf-8')) 
+            if header is None or header[0] == FRAME_BYE:
+                said_bye = header is not None
+                log.info(f"[SERVER] {sender_label} meminta keluar.")
                 break
+            frame_type, length, _ = header
+            if frame_type != FRAME_DATA:
+                reader.skip(length)
+                log.warning(f"[SERVER WARN] Frame tak terduga (jenis {frame_type}) dari {sender_label}. Diabaikan.")
+                continue
+            messages_in.inc()
+            bytes_in.inc(length)
+            
+            # Room diakses langsung dari anggota: tanpa pencarian, berapa pun jumlah room
+            room = member.room
+            receivers = room.others(member) if room is not None else []
+            
+            if not receivers:
+                reader.skip(length)
+                log.warning(f"[SERVER WARN] Belum ada anggota lain di room {sender_label}. Pesan diabaikan.")
+                continue
                 
-            print("-" * 40)
-            print(f"[RELAY] Dari {sender_label} ke {receiver_label}: {ciphertext_hex}")
-            print("-" * 40)
+            relay_log.info("[RELAY] [%s] Dari %s ke %s: %d byte ciphertext",
+                           room.name, sender_label, ', '.join(r.label for r in receivers), length)
             
-            # Kirim data ke penerima
-            if receiver_conn:
-                receiver_conn.send(ciphertext_hex.encode('utf-8'))
-            else:
-                # Klien A dapat mengirim, tetapi klien B belum terhubung
-                print(f"[SERVER WARN] {receiver_label} belum terhubung. Pesan diabaikan.") 
+            # Teruskan payload ke antrian semua penerima (termasuk yang sedang offline)
+            for receiver, e in forwarder.forward(reader, length, receivers):
+                log.warning(f"[SERVER WARN] Gagal mengirim ke {receiver.label}: {e}")
+                errors.labels('send').inc()
+
+            # Backpressure: berhenti membaca dari pengirim selama antrian penerima penuh
+            for receiver in receivers:
+                queue = receiver.writer
+                if queue.paused:
+                    backpressure_log.info("[SERVER] Antrian %s penuh (%d byte). Menahan %s.",
+                                          receiver.label, queue.stats()['bytes'], sender_label)
+                    if not queue.wait_writable(BACKPRESSURE_TIMEOUT):
+                        log.warning(f"[SERVER WARN] Antrian {receiver.label} belum berkurang setelah {BACKPRESSURE_TIMEOUT:.0f} detik.")
+                        errors.labels('backpressure_timeout').inc()
 
+        except ProtocolError as e:
+            log.error(f"[SERVER ERROR] Frame tidak valid dari {sender_label}: {e}")
+            errors.labels('protocol').inc()
+            break
         except Exception as e:
-            print(f"[SERVER ERROR] Koneksi {sender_label} terputus: {e}")
-            with lock:
-                receiver_conn = receiver_conn_ref()
-            if receiver_conn:
-                try:
-                    receiver_conn.send("keluar".encode('utf-8'))
-                except:
-                    pass
+            log.error(f"[SERVER ERROR] Koneksi {sender_label} terputus: {e}")
+            errors.labels('connection').inc()
             break
+    forwarder.close()
+    member.writer.detach()
+    
+    if said_bye or member.key == member.label:
+        leave_room(member)
+    else:
+        # Terputus tanpa pamit: tetap di room sementara, pesan untuknya diantrekan
+        mark_offline(member)
             
     try:
-        sender_conn.close()
+        conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    try:
+        conn.close()
     except:
         pass
 
-# Fungsi referensi untuk mengambil socket klien yang terhubung (untuk diakses oleh thread relay)
-def get_client_a_socket():
-    return client_a_socket
+def leave_room(member):
+    """Mengeluarkan anggota dari room-nya dan menutup antriannya"""
+    member.writer.close()
+    notify_dissolved(rooms.leave(member))
+
+def notify_dissolved(remaining):
+    """Room bubar: anggota tersisa diberi sinyal keluar (antrian anggota offline ditutup)"""
+    for other in remaining:
+        log.info(f"[SERVER] Room bubar. Memberi sinyal keluar ke {other.label}.")
+        if other.online:
+            other.send(FRAME_BYE)
+        else:
+            other.writer.close()
+
+def mark_offline(member):
+    """Anggota ber-ID menunggu tersambung kembali paling lama OFFLINE_GRACE detik"""
+    rooms.mark_offline(member)
+    log.info(f"[SERVER] {member.label} offline. Pesan diantrekan selama {OFFLINE_GRACE:.0f} detik.")
+    timer = threading.Timer(OFFLINE_GRACE, expire_member, args=(member,))
+    timer.daemon = True
+    timer.start()
+
+def expire_member(member):
+    """Dipanggil setelah OFFLINE_GRACE: anggota yang belum kembali dikeluarkan dari room"""
+    remaining = rooms.expire(member)
+    if remaining is None:
+        return
+    log.info(f"[SERVER] {member.label} tidak kembali dalam {OFFLINE_GRACE:.0f} detik. Dikeluarkan dari room.")
+    member.writer.close()
+    notify_dissolved(remaining)
+
+def queue_depths():
+    """Kedalaman antrian keluar setiap anggota: {label: OutboundQueue.stats()}"""
+    return {member.label: member.writer.stats() for member in rooms.members()}
 
-def get_client_b_socket():
-    return client_b_socket
+queue_bytes.set_function(lambda: sum(stats['bytes'] for stats in queue_depths().values()))
+queue_frames.set_function(lambda: sum(stats['frames'] for stats in queue_depths().values()))
+queue_max_bytes.set_function(lambda: max((stats['bytes'] for stats in queue_depths().values()), default=0))
+queue_dropped.set_function(lambda: sum(stats['dropped'] for stats in queue_depths().values()))
+room_members.labels('online').set_function(lambda: sum(member.online for member in rooms.members()))
+room_members.labels('offline').set_function(lambda: sum(not member.online for member in rooms.members()))
+
+def record_sent(frame_type, size, queued_ns):
+    """Hook OutboundQueue.on_sent: frame DATA sampai di socket penerima"""
+    if frame_type == FRAME_DATA:
+        relay_latency.observe_ns(time.perf_counter_ns() - queued_ns)
+        messages_out.inc()
+        bytes_out.inc(size)
+
+# Fungsi untuk melayani satu client: status awal, Public Key, masuk room, lalu relay
+def handle_client(conn, addr, client_label):
+    connections_accepted.inc()
+    connections_active.inc()
+    try:
+        serve_client(conn, addr, client_label)
+    finally:
+        connections_active.dec()
+
+def serve_client(conn, addr, client_label):
+    log.info(f"[KONEKSI] {client_label} terhubung dari {addr}")
+    member = None
+    reader = FrameReader(conn)
+    writer = FrameWriter(conn)
+    try:
+        # Kirim pesan status awal
+        writer.send(FRAME_STATUS, f"Berhasil terhubung sebagai {client_label}. Menunggu Public Key...".encode('utf-8'))
+        
+        # Terima Public Key (dan nama room serta ID opsional)
+        handshake_started = time.perf_counter_ns()
+        pubkey_pem, room_name, client_id = receive_client_pubkey(conn, reader, client_label)
+        if not pubkey_pem:
+            errors.labels('handshake').inc()
+            conn.close()
+            return
+        
+        member = Member(client_label, writer, pubkey_pem, key=client_id)
+        previous = rooms.take_offline(client_id) if client_id else None
+        if previous is not None:
+            resume_member(previous, member, writer)
+        else:
+            # Semua frame ke client ini lewat antrian terbatas yang dikosongkan thread-nya sendiri
+            member.writer = OutboundQueue(writer, on_sent=record_sent)
+            member.writer.start(name=f"{client_label} antrian")
+            recipients = rooms.join(member, room_name)
+            room = member.room
+            log.info(f"[SERVER] {client_label} masuk room {room.name} ({len(room.members)} anggota).")
+            
+            # Room baru aktif (semua anggota) atau sudah aktif (anggota baru saja): bagikan kunci sesi
+            if recipients:
+                log.info(f"[SERVER INFO] Key Exchange untuk room {room.name}...")
+                send_encrypted_keys(room.session_key, recipients)
+        handshake_seconds.observe_ns(time.perf_counter_ns() - handshake_started)
+    except Exception as e:
+        log.error(f"[SERVER ERROR] {client_label}: {e}")
+        errors.labels('handshake').inc()
+        if member is not None and isinstance(member.writer, OutboundQueue):
+            leave_room(member)
+        try:
+            conn.close()
+        except:
+            pass
+        return
+    
+    relay_message(conn, reader, member)
+
+def resume_member(previous, member, writer):
+    """Client ber-ID tersambung kembali: kunci sesi dikirim langsung ke koneksi baru,
+    lalu antrian milik koneksi lama (berisi pesan yang tertunda) dipasang ke koneksi ini"""
+    room = previous.room
+    if not send_encrypted_keys(room.session_key, [member]):
+        # Sesi lama tetap menunggu koneksi berikutnya
+        mark_offline(previous)
+        raise ConnectionError(f"Gagal melanjutkan sesi {member.key}.")
+    queue = previous.writer
+    member.writer = queue
+    if rooms.replace(previous, member) is None:
+        raise ConnectionError(f"Room {room.name} sudah bubar.")
+    pending = queue.stats()['frames']
+    queue.attach(writer)
+    log.info(f"[SERVER] {member.label} kembali ke room {room.name} sebagai {member.key} ({pending} pesan tertunda).")
 
 def start_server():
-    global client_a_socket, client_b_socket, client_a_pubkey, client_b_pubkey
+    eventlog.setup()
+    eventlog.install_dump_signal()
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # Server berjalan terus; izinkan restart cepat tanpa menunggu TIME_WAIT
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
     try:
         server_socket.bind((HOST, PORT))
     except OSError as e:
-        print(f"[ERROR] Tidak dapat mengikat ke {HOST}:{PORT}: {e}")
+        log.error(f"[ERROR] Tidak dapat mengikat ke {HOST}:{PORT}: {e}")
         sys.exit(1)
         
-    server_socket.listen(2) 
-    print(f"[SERVER] Server berjalan di {HOST}:{PORT}")
-    print("[SERVER] Menunggu 2 Client (A dan B) untuk terhubung...")
+    server_socket.listen(BACKLOG) 
+    log.info(f"[SERVER] Server berjalan di {HOST}:{PORT}")
+    if METRICS_SOCKET or METRICS_PORT:
+        try:
+            metrics.serve(METRICS_PORT, HOST, unix_socket=METRICS_SOCKET)
+            log.info(f"[SERVER] Metrik Prometheus di {METRICS_SOCKET or f'http://{HOST}:{METRICS_PORT}/metrics'}")
+        except OSError as e:
+            log.warning(f"[SERVER WARN] Endpoint metrik tidak dapat dibuka: {e}")
+    log.info("[SERVER] Menunggu Client. Client tanpa nama room dipasangkan otomatis berdua.")
+    log.info("[SERVER] Tekan Ctrl+C untuk mematikan Server.")
     
     clients_count = 0
     
-    while clients_count < 2:
-        try:
-            conn, addr = server_socket.accept()
+    # Loop accept terus berjalan; setiap client dilayani thread-nya sendiri
+    try:
+        while True:
+            try:
+                conn, addr = server_socket.accept()
+            except OSError as e:
+                log.error(f"[SERVER ERROR] {e}")
+                errors.labels('accept').inc()
+                continue
             clients_count += 1
-            
-            with lock:
-                if clients_count == 1:
-                    client_a_socket = conn
-                    client_label = 'Client A'
-                    client_pubkey_ref = lambda: client_a_pubkey
-                else:
-                    client_b_socket = conn
-                    client_label = 'Client B'
-                    client_pubkey_ref = lambda: client_b_pubkey
-
-            print(f"[KONEKSI] {client_label} terhubung dari {addr}")
-            
-            # Kirim pesan status awal
-            conn.send(f"Berhasil terhubung sebagai {client_label}. Menunggu Public Key...".encode('utf-8'))
-            
-            # Terima Public Key
-            pubkey_received = receive_client_pubkey(conn, client_label)
-
-            # Jika ini klien kedua yang terhubung, segera lakukan key exchange
-            if clients_count == 2 and pubkey_received:
-                print("[SERVER INFO] Kedua Client terhubung. Memulai Key Exchange Terakhir...")
-                
-                # Cek dan kirim kunci sesi ke A dan B
-                if client_a_pubkey and client_b_pubkey:
-                    # Kirim Kunci Sesi DES terenkripsi ke Client A
-                    send_encrypted_key(client_a_socket, client_a_pubkey)
-                    
-                    # Kirim Kunci Sesi DES terenkripsi ke Client B
-                    send_encrypted_key(client_b_socket, client_b_pubkey)
-                    
-                    print("[SERVER] Relay aktif. Server berjalan di latar belakang.")
-
-                    # Memulai thread relay 2 arah (A -> B) dan (B -> A)
-                    threading.Thread(target=relay_message, 
-                                     args=(client_a_socket, get_client_b_socket, 'Client A', 'Client B'), 
-                                     daemon=True).start()
-                    
-                    threading.Thread(target=relay_message, 
-                                     args=(client_b_socket, get_client_a_socket, 'Client B', 'Client A'), 
-                                     daemon=True).start()
-                    
-                    # Keluar dari loop penerimaan, lanjutkan ke loop tidur
-                    break
-                else:
-                    print("[SERVER WARN] Public Key Client tidak lengkap. Tidak dapat melakukan Key Exchange Aman. Server ditutup.")
-                    # Tutup koneksi jika gagal
-                    client_a_socket.close()
-                    client_b_socket.close()
-                    return 
-            
-        except KeyboardInterrupt:
-            print("\n[SERVER] Server dimatikan.")
-            server_socket.close()
-            sys.exit(0)
-        except Exception as e:
-            print(f"[SERVER ERROR] {e}")
-
-    # Jaga thread utama agar tetap hidup
-    if clients_count == 2:
-        print("[SERVER] Tekan Ctrl+C untuk mematikan Server.")
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("\n[SERVER] Server dimatikan.")
-        finally:
-            server_socket.close()
-            print("[SERVER] Program selesai.")
+            threading.Thread(target=handle_client, 
+                             args=(conn, addr, f"Client {clients_count}"), 
+                             daemon=True).start()
+    except KeyboardInterrupt:
+        log.info("[SERVER] Server dimatikan.")
+    finally:
+        server_socket.close()
+        log.info("[SERVER] Program selesai.")
+        eventlog.shutdown()
 
 
 if __name__ == "__main__":
-    start_server()
\ No newline at end of file
+    start_server()